@@ -8,6 +8,16 @@ APP_VERSION = "v0.3.0"  # bump when you ship
 NOTION_VERSION = "2025-09-03"
 DEFAULT_OPENAI_MODEL = "gpt-5-mini"
 
+# Vision input budget: image area and detail level drive both latency and billed tokens.
+IMAGE_MAX_EDGE_PX = 1800
+JPEG_QUALITY = 75
+DEFAULT_IMAGE_DETAIL = "auto"  # "low" | "high" | "auto"; override via config IMAGE_DETAIL
+
+# Upload + transcription run ahead of the ordered Notion append on a small thread pool.
+DEFAULT_PIPELINE_WORKERS = 4  # override via config CONCURRENCY
+# Images per OpenAI call; the shared PROMPT is billed once per call. Override via TRANSCRIBE_BATCH_SIZE.
+DEFAULT_TRANSCRIBE_BATCH_SIZE = 4
+
 # TODO: Replace with your current official OpenAI pricing for the model you use.
 PRICE_PER_1M_INPUT_TOKENS_USD = 1.00
 PRICE_PER_1M_OUTPUT_TOKENS_USD = 3.00
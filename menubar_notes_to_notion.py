@@ -3,13 +3,27 @@
 # ------------------------------
 # IMPORTANT: Log init must happen before other imports to catch startup issues.
 
+import atexit
 import os
+import queue
 import sys
+import threading
+import time
 from pathlib import Path
 from datetime import datetime
 from dataclasses import dataclass
-from app_contract import APP_NAME, APP_VERSION, NOTION_VERSION, DEFAULT_OPENAI_MODEL
-from prompt_contract import PROMPT
+from app_contract import (
+    APP_NAME,
+    APP_VERSION,
+    NOTION_VERSION,
+    DEFAULT_OPENAI_MODEL,
+    IMAGE_MAX_EDGE_PX,
+    JPEG_QUALITY,
+    DEFAULT_IMAGE_DETAIL,
+    DEFAULT_PIPELINE_WORKERS,
+    DEFAULT_TRANSCRIBE_BATCH_SIZE,
+)
+from prompt_contract import PROMPT, batch_prompt
 from usage_tracker import (
     append_event as usage_append_event,
     aggregates as usage_aggregates,
@@ -20,14 +34,69 @@ LOG_DIR = Path.home() / "Library" / "Application Support" / "NotesToNotion"
 LOG_DIR.mkdir(parents=True, exist_ok=True)
 LOG_FILE = LOG_DIR / "app.log"
 
-def log(msg: str):
-    ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+# Log lines are queued and written by one background thread, so callers on the
+# watcher/pipeline threads never wait on open/write/close of app.log.
+_LOG_QUEUE: "queue.SimpleQueue" = queue.SimpleQueue()
+_LOG_STOP = object()
+_LOG_BATCH_MAX = 64
+
+
+def _log_append(text: str) -> None:
     try:
         with open(LOG_FILE, "a", encoding="utf-8") as f:
-            f.write(f"[{ts}] {msg}\n")
+            f.write(text)
     except Exception:
         pass
 
+
+def _log_writer() -> None:
+    f = None
+    while True:
+        batch = [_LOG_QUEUE.get()]
+        while len(batch) < _LOG_BATCH_MAX:
+            try:
+                batch.append(_LOG_QUEUE.get_nowait())
+            except queue.Empty:
+                break
+        stop = any(item is _LOG_STOP for item in batch)
+        text = "".join(item for item in batch if item is not _LOG_STOP)
+        if text:
+            try:
+                if f is None:
+                    f = open(LOG_FILE, "a", encoding="utf-8", buffering=1 << 16)
+                f.write(text)
+                f.flush()
+            except Exception:
+                f = None
+        if stop:
+            if f is not None:
+                f.close()
+            return
+
+
+_LOG_THREAD = threading.Thread(target=_log_writer, name="log-writer", daemon=True)
+_LOG_THREAD.start()
+
+
+def log(msg: str):
+    # time.strftime formats the struct_time directly; no datetime object per line.
+    line = f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] {msg}\n"
+    if _LOG_THREAD.is_alive():
+        _LOG_QUEUE.put(line)
+    else:
+        # Writer already drained at exit (or died): write synchronously.
+        _log_append(line)
+
+
+def flush_log(timeout: float = 2.0) -> None:
+    """Drain queued lines and stop the writer; runs at exit so a FATAL line still lands."""
+    if _LOG_THREAD.is_alive():
+        _LOG_QUEUE.put(_LOG_STOP)
+        _LOG_THREAD.join(timeout)
+
+
+atexit.register(flush_log)
+
 log("=== App starting ===")
 log(f"Python: {sys.version}")
 log(f"Executable: {sys.executable}")
@@ -36,25 +105,28 @@ log(f"Model: {DEFAULT_OPENAI_MODEL}")
 # ------------------------------
 # Normal imports (may crash in bundles; logging above helps)
 # ------------------------------
+import binascii
+import functools
 import io
 import json
+import math
 import re
-import time
 import subprocess
-import threading
 import uuid
-from typing import Optional, List
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional, List
 
 import rumps
 import keyring
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from watchdog.observers import Observer
+from watchdog.observers.polling import PollingObserver
 from watchdog.events import FileSystemEventHandler
-from openai import OpenAI
 
-from PIL import Image
+from PIL import Image, ImageOps
 
-from prompt_contract import PROMPT
 from notion_format import build_notion_blocks
 
 try:
@@ -75,6 +147,67 @@ except Exception as e:
     HEIC_OK = False
     log(f"pillow_heif NOT available: {repr(e)}")
 
+# In-process HEIC decode via ImageIO, used only when pillow_heif is missing; sips is the last resort.
+try:
+    from Foundation import NSURL, NSMutableData
+    from Quartz import (
+        CGImageDestinationAddImageFromSource,
+        CGImageDestinationCreateWithData,
+        CGImageDestinationFinalize,
+        CGImageSourceCreateWithURL,
+    )
+    IMAGEIO_OK = True
+except Exception:
+    IMAGEIO_OK = False
+
+# orjson is a speed-up only; fall back to stdlib json if it is missing in a bundle.
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+# openai drags in httpx + pydantic (hundreds of ms in the bundle); it is only needed
+# once a Pipeline is built, so import it then and let the menubar icon appear first.
+OpenAI = None
+DefaultHttpxClient = None
+httpx = None
+
+
+def _load_openai() -> None:
+    global OpenAI, DefaultHttpxClient, httpx
+    if OpenAI is None or DefaultHttpxClient is None:
+        import openai
+        OpenAI = OpenAI or openai.OpenAI
+        DefaultHttpxClient = DefaultHttpxClient or openai.DefaultHttpxClient
+    if httpx is None:
+        # Only needed to tune pool limits; the SDK defaults still work without it.
+        try:
+            import httpx as _httpx
+            httpx = _httpx
+        except Exception:
+            pass
+
+
+def _openai_http_client(max_workers: int):
+    kwargs = {"http2": HTTP2_OK}
+    if httpx is not None:
+        # httpx drops idle connections after 5s, but drops arrive minutes apart; keep
+        # one warm TLS connection per pipeline worker between them.
+        kwargs["limits"] = httpx.Limits(
+            max_connections=max(8, max_workers * 2),
+            max_keepalive_connections=max_workers,
+            keepalive_expiry=OPENAI_KEEPALIVE_SECS,
+        )
+    return DefaultHttpxClient(**kwargs)
+
+
+# HTTP/2 for the OpenAI transport is best-effort; httpx needs the optional `h2` package.
+try:
+    import h2  # noqa: F401
+    HTTP2_OK = True
+except Exception:
+    HTTP2_OK = False
+
 SERVICE_NAME = "com.notes-to-notion"
 
 CONFIG_DIR = LOG_DIR
@@ -88,8 +221,29 @@ SESSION_TOPIC_TTL_SECONDS = 300
 _HASH_TOPIC_RE = re.compile(r"^\s*#\s*(.+)\s*$")
 _HASH_DELIMITER_RE = re.compile(r"^\s*#\s+(.+)\s*$")
 _IMG_NUM_RE = re.compile(r"(?i)^img[_-]?(\d+)$")
+_NOTION_ID_RE = re.compile(r"([0-9a-fA-F]{32})")
+_HEX_DIGITS = frozenset("0123456789abcdefABCDEF")
 BATCH_WINDOW_SECS = 120
+STATE_COMPACT_EVERY = 1000
+NOTION_APPEND_CHUNK = 100  # Notion's max children per append request
+H1_CACHE_TTL_SECS = 300.0
+_LAST_NOTE_STATE_KEYS = ("last_note_url", "last_note_ts", "last_note_title")
 WATCH_BATCH_DEBOUNCE_SECS = 1.0
+STABLE_POLL_SECS = 0.1
+# A file counts as written once its size has held this long; sync clients and SMB
+# copies pause mid-write for longer than a single poll tick.
+STABLE_QUIET_SECS = 0.25
+STABLE_WAIT_MAX_SECS = 15.0
+POLLING_OBSERVER_SECS = 1.0
+OPENAI_KEEPALIVE_SECS = 120.0
+MENU_REFRESH_SECS = 0.5
+# The SDK backs off exponentially with jitter and honours Retry-After on 408/409/429/5xx;
+# its default of 2 gives up within a few seconds of a rate-limit burst.
+OPENAI_MAX_RETRIES = 5
+# Remote filesystems where FSEvents/inotify do not see writes made by other machines.
+_NETWORK_FS_TYPES = frozenset({"smbfs", "afpfs", "nfs", "nfs4", "webdav", "cifs", "smb3"})
+# `mount` lines: macOS "… on /Volumes/x (smbfs, …)", Linux "… on /mnt/x type nfs4 (…)".
+_MOUNT_LINE_RE = re.compile(r" on (.+?) (?:\(([^,)]+)|type (\S+))")
 
 
 @dataclass
@@ -103,6 +257,16 @@ class BatchContext:
     ignore_window: bool = False
 
 
+@dataclass
+class PreparedImage:
+    """Per-file result of the network-bound half of Pipeline.process."""
+    fingerprint: str
+    already_processed: bool = False
+    image_file_upload_id: Optional[str] = None
+    parsed: Optional[dict] = None
+    usage: Optional[dict] = None
+
+
 _APPENDABLE_BLOCK_TYPES = {
     "paragraph",
     "heading_1",
@@ -123,25 +287,52 @@ def list_pending_images(watch: Path) -> List[Path]:
     and excluding the _processed/_failed directories.
     Returns sorted by mtime (oldest first) for deterministic batching.
     """
-    pending: List[Path] = []
-    for p in watch.iterdir():
-        if p.is_dir():
-            continue
-        if p.name.startswith("."):
-            continue
-        if p.suffix.lower() not in SUPPORTED_EXTS:
-            continue
-        pending.append(p)
+    # scandir hands back d_type with each name, so filtering needs no stat; the
+    # mtime is only fetched (and cached on the entry) for names the sort needs it for.
+    entries = []
+    with os.scandir(watch) as it:
+        for e in it:
+            if e.name.startswith("."):
+                continue
+            if os.path.splitext(e.name)[1].lower() not in SUPPORTED_EXTS:
+                continue
+            if e.is_dir():
+                continue
+            entries.append(e)
 
-    def _sort_key(p: Path):
-        stem = p.stem or ""
-        m = _IMG_NUM_RE.match(stem)
+    def _sort_key(e: os.DirEntry):
+        name = e.name
+        m = _IMG_NUM_RE.match(os.path.splitext(name)[0])
         if m:
-            return (0, int(m.group(1)), p.name.lower())
-        return (1, p.stat().st_mtime, p.name.lower())
+            return (0, int(m.group(1)), name.lower())
+        return (1, e.stat().st_mtime, name.lower())
 
-    pending.sort(key=_sort_key)
-    return pending
+    entries.sort(key=_sort_key)
+    return [Path(e.path) for e in entries]
+
+
+def is_network_volume(path: Path) -> bool:
+    """
+    Best-effort: True when `path` lives on a network share (SMB/AFP/NFS/WebDAV),
+    judged by the filesystem type of its longest matching mount point.
+    """
+    try:
+        out = subprocess.run(["mount"], capture_output=True, text=True, timeout=2).stdout
+    except Exception:
+        return False
+    target = str(path.resolve())
+    best_mount, best_type = "", ""
+    for line in out.splitlines():
+        m = _MOUNT_LINE_RE.search(line)
+        if not m:
+            continue
+        mount_point = m.group(1)
+        fs_type = m.group(2) or m.group(3)
+        if target != mount_point and not target.startswith(mount_point.rstrip("/") + "/"):
+            continue
+        if len(mount_point) > len(best_mount):
+            best_mount, best_type = mount_point, fs_type
+    return best_type.lower() in _NETWORK_FS_TYPES
 
 
 def get_failed_count(watch_folder: Optional[Path]) -> int:
@@ -151,34 +342,105 @@ def get_failed_count(watch_folder: Optional[Path]) -> int:
     if not failed_dir.exists() or not failed_dir.is_dir():
         return 0
     try:
-        return sum(1 for p in failed_dir.iterdir() if p.is_file() and not p.name.startswith("."))
+        with os.scandir(failed_dir) as it:
+            return sum(1 for e in it if not e.name.startswith(".") and e.is_file())
     except Exception:
         return 0
 
 
+def json_dumps_bytes(obj, pretty: bool = False) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+    return json.dumps(obj, ensure_ascii=False, indent=2 if pretty else None).encode("utf-8")
+
+
+def json_loads(data):
+    """Accepts str or bytes."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def write_bytes_atomic(path: Path, data: bytes) -> None:
+    """
+    Write next to the target and rename over it, so a crash mid-write leaves
+    the previous file intact instead of truncated JSON.
+    """
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        # Rare (compaction/close/setup), so paying for durability before the rename is fine.
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
 def load_config() -> dict:
     if not CONFIG_PATH.exists():
         return {}
-    return json.loads(CONFIG_PATH.read_text("utf-8"))
+    return json_loads(CONFIG_PATH.read_bytes())
 
 
 def save_config(cfg: dict) -> None:
     CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-    CONFIG_PATH.write_text(json.dumps(cfg, ensure_ascii=False, indent=2), "utf-8")
+    write_bytes_atomic(CONFIG_PATH, json_dumps_bytes(cfg, pretty=True))
+
+
+def state_log_path() -> Path:
+    return STATE_PATH.with_suffix(".jsonl")
+
+
+def _state_replay_log(state: dict) -> dict:
+    log_path = state_log_path()
+    if not log_path.exists():
+        return state
+    processed = state.setdefault("processed", {})
+    try:
+        with open(log_path, "rb") as f:
+            for line in f:
+                try:
+                    record = json_loads(line)
+                except Exception:
+                    # Torn last line after a crash; everything before it is still valid.
+                    continue
+                fp = record.pop("fp", None)
+                if fp:
+                    processed[fp] = {"name": record.pop("name", ""), "ts": record.pop("ts", 0.0)}
+                state.update(record)
+    except Exception as e:
+        log(f"State log replay failed (ignored): {repr(e)}")
+    return state
 
 
 def state_load() -> dict:
+    """
+    Snapshot (processed.json) + append-only log (processed.jsonl) replayed on top.
+    """
+    state = {"processed": {}}
     if STATE_PATH.exists():
         try:
-            return json.loads(STATE_PATH.read_text("utf-8"))
+            state = json_loads(STATE_PATH.read_bytes())
         except Exception:
-            return {"processed": {}}
-    return {"processed": {}}
+            state = {"processed": {}}
+    return _state_replay_log(state)
+
+
+def state_append(record: dict) -> None:
+    CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+    with open(state_log_path(), "ab") as f:
+        f.write(json_dumps_bytes(record) + b"\n")
 
 
 def state_save(state: dict) -> None:
+    """
+    Write a full snapshot and drop the log it supersedes (compaction).
+    """
     CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-    STATE_PATH.write_text(json.dumps(state, ensure_ascii=False, indent=2), "utf-8")
+    write_bytes_atomic(STATE_PATH, json_dumps_bytes(state, pretty=True))
+    try:
+        state_log_path().unlink()
+    except FileNotFoundError:
+        pass
 
 
 def usage_int(usage: object, field: str) -> int:
@@ -194,59 +456,213 @@ def usage_int(usage: object, field: str) -> int:
         return 0
 
 
+def split_usage(usage: Optional[dict], n: int) -> List[dict]:
+    """
+    Spread one call's token usage over n images so per-image events still sum
+    to the billed totals.
+    """
+    usage = usage or {}
+    n = max(int(n), 1)
+    out = [{"model": usage.get("model")} for _ in range(n)]
+    for field in ("input_tokens", "output_tokens"):
+        total = usage_int(usage, field)
+        share, rest = divmod(total, n)
+        for i, item in enumerate(out):
+            item[field] = share + (1 if i < rest else 0)
+    return out
+
+
+_JSON_DECODER = json.JSONDecoder()
+
+
+def parse_model_json(out: str, key: str = "topics"):
+    """
+    Return the first JSON object in the model output that carries `key` at its top
+    level ("topics" for one image, "results" for a batch). Anything else, including
+    an inner fragment of a truncated reply, raises.
+    """
+    out = out.strip()
+    # Fast path: the model usually returns exactly one bare object.
+    if out.startswith("{") and out.endswith("}"):
+        try:
+            data = json_loads(out)
+        except Exception:
+            data = None
+        if isinstance(data, dict) and key in data:
+            return data
+    # Otherwise let the C decoder parse the first complete object in place: it stops at
+    # the object's end (no rfind/slice) and already knows about braces inside strings.
+    start = out.find("{")
+    while start != -1:
+        try:
+            data = _JSON_DECODER.raw_decode(out, start)[0]
+        except ValueError:
+            data = None
+        if isinstance(data, dict) and key in data:
+            return data
+        start = out.find("{", start + 1)
+    raise RuntimeError("Model did not return valid JSON.")
+
+
+def _settle_group_futures(task: Future, futures: List[Future]) -> None:
+    # A cancelled or crashed group task must not leave process() waiting forever.
+    for fut in futures:
+        if fut.done():
+            continue
+        if task.cancelled():
+            fut.cancel()
+        else:
+            fut.set_exception(task.exception() or RuntimeError("Image preparation did not finish."))
+
+
 def keychain_set(name: str, value: str) -> None:
     keyring.set_password(SERVICE_NAME, name, value)
+    _keychain_get_cached.cache_clear()
 
 
-def keychain_get(name: str) -> Optional[str]:
+@functools.lru_cache(maxsize=8)
+def _keychain_get_cached(name: str) -> Optional[str]:
     return keyring.get_password(SERVICE_NAME, name)
 
 
+def keychain_get(name: str) -> Optional[str]:
+    # Each Keychain read is an XPC round-trip (and may prompt); keep values in
+    # process memory only, cleared whenever setup writes a new secret.
+    return _keychain_get_cached(name)
+
+
+@functools.lru_cache(maxsize=64)
 def extract_notion_page_id(input_str: str) -> str:
     """
     Accepts Notion URL or raw page id.
     Extracts 32 hex chars and returns dashed UUID.
     """
     s = (input_str or "").strip()
-    s = s.split("?")[0]
-    m = re.search(r"([0-9a-fA-F]{32})", s.replace("-", ""))
-    if not m:
-        raise ValueError("Could not find a valid Notion page ID in the URL/text.")
-    raw = m.group(1).lower()
+    s = s.split("?", 1)[0]
+    # Canonical shape first: the id is the last 32 chars of the last path segment,
+    # either alone or after "Title-". Taking it from the end also keeps hex-looking
+    # title letters (e.g. "Cafe-<id>") from being glued onto the front.
+    tail = s.rstrip("/").rsplit("/", 1)[-1]
+    if len(tail) >= 36 and tail[-28] == tail[-23] == tail[-18] == tail[-13] == "-":
+        # Already-dashed UUID (pasted id or dashed link): fold it to the 32-char form.
+        tail = tail[:-36] + tail[-36:].replace("-", "")
+    raw = tail[-32:]
+    if not (
+        len(raw) == 32
+        and (len(tail) == 32 or tail[-33] == "-")
+        and _HEX_DIGITS.issuperset(raw)
+    ):
+        m = _NOTION_ID_RE.search(s.replace("-", ""))
+        if not m:
+            raise ValueError("Could not find a valid Notion page ID in the URL/text.")
+        raw = m.group(1)
+    raw = raw.lower()
     return f"{raw[0:8]}-{raw[8:12]}-{raw[12:16]}-{raw[16:20]}-{raw[20:32]}"
 
 
-def image_to_jpeg_bytes(path: Path) -> bytes:
+_EXIF_ORIENTATION = 0x0112
+_EXIF_GPS_IFD = 0x8825
+
+
+def _jpeg_passthrough_ok(img: "Image.Image") -> bool:
+    """
+    True when an opened JPEG can be sent as-is: within the edge budget, a mode
+    every consumer accepts, already upright, and no GPS block to leak to Notion/OpenAI
+    (re-encoding drops EXIF).
+    """
+    if img.format != "JPEG" or img.mode not in ("RGB", "L"):
+        return False
+    if max(img.size) > IMAGE_MAX_EDGE_PX:
+        return False
+    exif = img.getexif()
+    return exif.get(_EXIF_ORIENTATION, 1) == 1 and _EXIF_GPS_IFD not in exif
+
+
+def _open_heif_image(path: Path, data: Optional[bytes] = None) -> "Image.Image":
+    """
+    Decode HEIC straight to 8-bit pixels and wrap libheif's buffer without the
+    extra copy Image.open/to_pillow make. Non-alpha HEICs arrive as RGB, so the
+    JPEG path needs no convert at all.
+    """
+    heif = pillow_heif.open_heif(str(path) if data is None else data, convert_hdr_to_8bit=True)
+    return Image.frombuffer(heif.mode, heif.size, heif.data, "raw", heif.mode, heif.stride, 1)
+
+
+def _heic_to_jpeg_via_imageio(path: Path) -> Optional[bytes]:
+    """
+    Transcode with ImageIO into memory: no sips process spawn and no /tmp round-trip.
+    Returns None when ImageIO is unavailable or cannot read the file.
+    """
+    if not IMAGEIO_OK:
+        return None
+    try:
+        src = CGImageSourceCreateWithURL(NSURL.fileURLWithPath_(str(path)), None)
+        if src is None:
+            return None
+        data = NSMutableData.data()
+        dest = CGImageDestinationCreateWithData(data, "public.jpeg", 1, None)
+        CGImageDestinationAddImageFromSource(dest, src, 0, None)
+        if not CGImageDestinationFinalize(dest):
+            return None
+        return bytes(data)
+    except Exception as e:
+        log(f"ImageIO HEIC decode failed, falling back to sips: {repr(e)}")
+        return None
+
+
+def image_to_jpeg_bytes(path: Path, data: Optional[bytes] = None) -> bytes:
     """
     Convert image to JPEG bytes.
-    If HEIC can't be opened via pillow_heif in a bundle, fallback to macOS `sips`.
+    `data` is the file's content when the caller has already read it; decoding then
+    works from memory instead of reading the file again.
+    If HEIC can't be opened via pillow_heif in a bundle, fall back to ImageIO, then macOS `sips`.
     """
     suffix = path.suffix.lower()
     if suffix == ".heic" and not HEIC_OK:
-        tmp = Path("/tmp") / (path.stem + ".jpg")
-        subprocess.run(["sips", "-s", "format", "jpeg", str(path), "--out", str(tmp)], check=True)
-        img = Image.open(tmp)
+        transcoded = _heic_to_jpeg_via_imageio(path)
+        if transcoded is not None:
+            img = Image.open(io.BytesIO(transcoded))
+        else:
+            tmp = Path("/tmp") / (path.stem + ".jpg")
+            subprocess.run(["sips", "-s", "format", "jpeg", str(path), "--out", str(tmp)], check=True)
+            img = Image.open(tmp)
+    elif suffix == ".heic":
+        img = _open_heif_image(path, data)
     else:
-        img = Image.open(path)
-
-    w, h = img.size
-    longest = max(w, h)
-    if longest > 1800:
-        scale = 1800 / float(longest)
-        nw = max(1, int(round(w * scale)))
-        nh = max(1, int(round(h * scale)))
-        img = img.resize((nw, nh), Image.Resampling.LANCZOS)
-
-    if img.mode in ("RGBA", "P"):
+        img = Image.open(path if data is None else io.BytesIO(data))
+        if suffix in (".jpg", ".jpeg") and _jpeg_passthrough_ok(img):
+            # Already a JPEG inside the budget: decode + re-encode would only cost CPU and quality.
+            img.close()
+            return path.read_bytes() if data is None else data
+
+    # Downscale before anything else: vision tokens and upload size scale with image area.
+    if max(img.size) > IMAGE_MAX_EDGE_PX:
+        if img.format == "JPEG":
+            # Let libjpeg decode at 1/2, 1/4 or 1/8 scale (never below the budget)
+            # so LANCZOS only finishes the job instead of chewing full-size pixels.
+            img.draft("RGB", (IMAGE_MAX_EDGE_PX, IMAGE_MAX_EDGE_PX))
+        img.thumbnail((IMAGE_MAX_EDGE_PX, IMAGE_MAX_EDGE_PX), Image.Resampling.LANCZOS)
+
+    # Re-encoding drops EXIF, so bake the orientation into the pixels (after the
+    # downscale, so the transpose touches the smaller image).
+    if img.getexif().get(_EXIF_ORIENTATION, 1) != 1:
+        img = ImageOps.exif_transpose(img)
+
+    # RGB/L encode as-is; everything else (RGBA, P, LA, CMYK, ...) needs one pass to RGB.
+    if img.mode not in ("RGB", "L"):
         img = img.convert("RGB")
     buf = io.BytesIO()
-    img.save(buf, format="JPEG", quality=75)
+    img.save(buf, format="JPEG", quality=JPEG_QUALITY)
     return buf.getvalue()
 
 
+_JPEG_DATA_URL_PREFIX = b"data:image/jpeg;base64,"
+
+
 def jpeg_to_data_url(b: bytes) -> str:
-    import base64
-    return "data:image/jpeg;base64," + base64.b64encode(b).decode("utf-8")
+    # Encode straight after the prefix and decode once as ASCII (base64 is pure ASCII),
+    # instead of building an intermediate str and concatenating a second copy.
+    return (_JPEG_DATA_URL_PREFIX + binascii.b2a_base64(b, newline=False)).decode("ascii")
 
 
 def notion_id_without_dashes(raw_id: str) -> str:
@@ -266,14 +682,13 @@ def first_h2_section_title(blocks: list) -> Optional[str]:
         if block.get("type") != "heading_2":
             continue
         rt = ((block.get("heading_2") or {}).get("rich_text") or [])
-        text = "".join(
+        # join() materialises its input anyway; a list comprehension skips the generator frames.
+        text = "".join([
             ((p.get("text") or {}).get("content") or "")
             for p in rt
             if p.get("type") == "text"
-        ).strip()
-        if text.startswith("—"):
-            text = text[1:].strip()
-        elif text.startswith("-"):
+        ]).strip()
+        if text[:1] in ("—", "-"):
             text = text[1:].strip()
         return text or None
     return None
@@ -446,24 +861,52 @@ def dispatch_processed_image_notification(section_title: Optional[str], filename
     rumps.Timer(_one_shot, 0).start()
 
 
+class _NotionRetry(Retry):
+    """
+    Retry idempotent methods on 5xx and read errors, but POST/PATCH only on 429
+    (or when the connection was never made): a 5xx or a dropped response after an
+    append may already have created the blocks, and replaying it duplicates them.
+    """
+
+    def is_retry(self, method, status_code, has_retry_after=False):
+        # A rate-limited request was not applied, so any method may be replayed.
+        if status_code == 429 and self.status_forcelist and 429 in self.status_forcelist:
+            return True
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def _notion_session() -> requests.Session:
+    s = requests.Session()
+    retry = _NotionRetry(
+        total=5,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    s.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry))
+    return s
+
+
 class NotionClient:
     def __init__(self, token: str):
         self.token = token
         self.base = "https://api.notion.com/v1"
-
-    def _headers_json(self) -> dict:
-        return {
-            "Authorization": f"Bearer {self.token}",
-            "Notion-Version": NOTION_VERSION,
-            "Content-Type": "application/json",
-        }
-
-    def _headers_no_ct(self) -> dict:
+        # One pooled session: reuses TCP/TLS across calls and honours Retry-After on 429.
+        # Auth/version headers are set once here; only JSON bodies add a Content-Type.
         # For multipart/form-data requests, DO NOT set Content-Type manually.
-        return {
+        self.session = _notion_session()
+        self.session.headers.update({
             "Authorization": f"Bearer {self.token}",
             "Notion-Version": NOTION_VERSION,
-        }
+        })
+        # page_id -> (h1 block id, monotonic ts). Every note is inserted after the
+        # same H1, so re-listing the page on each image is wasted round-trips.
+        self._h1_cache: Dict[str, tuple] = {}
 
     def list_children_ids(self, block_id: str, page_size: int = 50) -> List[str]:
         """
@@ -477,7 +920,7 @@ class NotionClient:
             if cursor:
                 url += f"&start_cursor={cursor}"
 
-            r = requests.get(url, headers=self._headers_no_ct())
+            r = self.session.get(url)
             if r.status_code >= 300:
                 raise RuntimeError(f"Notion list children error {r.status_code}: {r.text}")
 
@@ -497,8 +940,20 @@ class NotionClient:
     def find_first_h1_id(self, page_id: str, page_size: int = 50) -> Optional[str]:
         """
         Returns the id of the first heading_1 block among the page's top-level children.
-        Paginates until found or no more results.
+        Paginates until found or no more results. A found id is reused for
+        H1_CACHE_TTL_SECS, or until an append after it fails.
         """
+        hit = self._h1_cache.get(page_id)
+        if hit and time.monotonic() - hit[1] < H1_CACHE_TTL_SECS:
+            return hit[0]
+        h1_id = self._fetch_first_h1_id(page_id, page_size)
+        if h1_id:
+            self._h1_cache[page_id] = (h1_id, time.monotonic())
+        else:
+            self._h1_cache.pop(page_id, None)
+        return h1_id
+
+    def _fetch_first_h1_id(self, page_id: str, page_size: int) -> Optional[str]:
         cursor = None
 
         while True:
@@ -506,7 +961,7 @@ class NotionClient:
             if cursor:
                 url += f"&start_cursor={cursor}"
 
-            r = requests.get(url, headers=self._headers_no_ct())
+            r = self.session.get(url)
             if r.status_code >= 300:
                 raise RuntimeError(f"Notion list children error {r.status_code}: {r.text}")
 
@@ -530,14 +985,17 @@ class NotionClient:
         if after_block_id:
             payload["after"] = after_block_id
 
-        r = requests.patch(url, headers=self._headers_json(), data=json.dumps(payload))
+        r = self.session.patch(url, headers=_JSON_HEADERS, data=json_dumps_bytes(payload))
         if r.status_code >= 300:
+            if after_block_id:
+                # The anchor may have been deleted or moved; look it up again next time.
+                self._h1_cache = {k: v for k, v in self._h1_cache.items() if v[0] != after_block_id}
             raise RuntimeError(f"Notion append error {r.status_code}: {r.text}")
         return r.json()
 
     def get_block(self, block_id: str) -> dict:
         url = f"{self.base}/blocks/{block_id}"
-        r = requests.get(url, headers=self._headers_no_ct())
+        r = self.session.get(url)
         if r.status_code >= 300:
             raise RuntimeError(f"Notion get block error {r.status_code}: {r.text}")
         return r.json() or {}
@@ -566,7 +1024,7 @@ class NotionClient:
             "content_type": content_type,
             "content_length": int(content_length),
         }
-        r = requests.post(url, headers=self._headers_json(), data=json.dumps(payload))
+        r = self.session.post(url, headers=_JSON_HEADERS, data=json_dumps_bytes(payload))
         if r.status_code >= 300:
             raise RuntimeError(f"Notion create file upload error {r.status_code}: {r.text}")
         return r.json()
@@ -574,7 +1032,7 @@ class NotionClient:
     def send_file_upload(self, file_upload_id: str, filename: str, content_type: str, data: bytes) -> dict:
         url = f"{self.base}/file_uploads/{file_upload_id}/send"
         files = {"file": (filename, data, content_type)}
-        r = requests.post(url, headers=self._headers_no_ct(), files=files)
+        r = self.session.post(url, files=files)
         if r.status_code >= 300:
             raise RuntimeError(f"Notion send file upload error {r.status_code}: {r.text}")
         return r.json()
@@ -595,17 +1053,73 @@ class NotionClient:
 
 
 class Pipeline:
-    def __init__(self, openai_key: str, model: str, notion_token: str, page_id: str, status_cb):
-        self.client = OpenAI(api_key=openai_key)
+    def __init__(
+        self,
+        openai_key: str,
+        model: str,
+        notion_token: str,
+        page_id: str,
+        status_cb,
+        image_detail: str = DEFAULT_IMAGE_DETAIL,
+        max_workers: int = DEFAULT_PIPELINE_WORKERS,
+        transcribe_batch_size: int = DEFAULT_TRANSCRIBE_BATCH_SIZE,
+    ):
+        # One keep-alive transport for the pipeline's lifetime; multiplexed when HTTP/2 is available.
+        max_workers = max(1, int(max_workers or 1))
+        _load_openai()
+        self.client = OpenAI(
+            api_key=openai_key,
+            max_retries=OPENAI_MAX_RETRIES,
+            http_client=_openai_http_client(max_workers),
+        )
         self.model = model
+        self.image_detail = image_detail or DEFAULT_IMAGE_DETAIL
         self.notion = NotionClient(notion_token)
         self.page_id = page_id
         self.status_cb = status_cb
         self.state = state_load()
-        self._last_usage = None
+        self._state_lock = threading.RLock()
+        self._unsaved_marks = 0
+        self._fp_cache: Dict[tuple, str] = {}
+        # Usage is per transcription; keep it per thread so prefetch workers don't clobber each other.
+        self._local = threading.local()
         self.active_topic: Optional[str] = None
         self.active_until: float = 0.0
         self.batch_ctx: Optional[BatchContext] = None
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="pipeline",
+        )
+        self.transcribe_batch_size = max(1, int(transcribe_batch_size or 1))
+        # Uploads get their own pool: group tasks wait on them, so sharing one pool could deadlock.
+        self._upload_executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="upload",
+        )
+        self._prefetched: Dict[str, Future] = {}
+        self._prefetch_lock = threading.Lock()
+        self._closed = False
+
+    @property
+    def _last_usage(self) -> Optional[dict]:
+        return getattr(self._local, "last_usage", None)
+
+    @_last_usage.setter
+    def _last_usage(self, value: Optional[dict]) -> None:
+        self._local.last_usage = value
+
+    def close(self) -> None:
+        with self._prefetch_lock:
+            self._closed = True
+            self._prefetched.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._upload_executor.shutdown(wait=False, cancel_futures=True)
+        try:
+            self.client.close()
+        except Exception:
+            pass
+        if self._unsaved_marks:
+            self.flush_state()
 
     def start_batch(self, ignore_window: bool = False) -> None:
         if self.batch_ctx is None:
@@ -617,36 +1131,64 @@ class Pipeline:
         if self.batch_ctx is not None:
             self.batch_ctx.ignore_window = False
 
-    def fingerprint(self, path: Path) -> str:
+    @staticmethod
+    def _stat_key(path: Path) -> tuple:
+        st = path.stat()
+        return (path.name, st.st_size, st.st_mtime_ns)
+
+    def _read_and_fingerprint(self, path: Path) -> tuple[str, Optional[bytes]]:
+        """
+        SHA-256 of the file, keyed by (name, size, mtime_ns) so replayed events and
+        re-dropped files are not read again. A file not seen this session is read once
+        and the same bytes are handed on to the decoder; a cache hit reads nothing and
+        returns no bytes. Stays SHA-256 so existing processed.json keys keep deduplicating.
+        """
         import hashlib
-        return hashlib.sha256(path.read_bytes()).hexdigest()
+        key = self._stat_key(path)
+        fp = self._fp_cache.get(key)
+        if fp is not None:
+            return fp, None
+        data = path.read_bytes()
+        fp = hashlib.sha256(data).hexdigest()
+        self._fp_cache[key] = fp
+        return fp, data
 
     def seen(self, fp: str) -> bool:
-        return fp in self.state.get("processed", {})
+        with self._state_lock:
+            return fp in self.state.get("processed", {})
 
     def mark(self, fp: str, name: str) -> None:
-        self.state.setdefault("processed", {})[fp] = {"name": name, "ts": time.time()}
-        state_save(self.state)
-
-    def transcribe_from_jpeg(self, jpeg_bytes: bytes, filename: str) -> dict:
-        data_url = jpeg_to_data_url(jpeg_bytes)
-
-        self.status_cb(f"Transcribing: {filename}")
-        log(f"Transcribing: {filename}")
-
+        with self._state_lock:
+            ts = time.time()
+            self.state.setdefault("processed", {})[fp] = {"name": name, "ts": ts}
+            record = {"fp": fp, "name": name, "ts": ts}
+            for key in _LAST_NOTE_STATE_KEYS:
+                if key in self.state:
+                    record[key] = self.state[key]
+            state_append(record)
+            self._unsaved_marks += 1
+            if self._unsaved_marks >= STATE_COMPACT_EVERY:
+                self.flush_state()
+
+    def flush_state(self) -> None:
+        with self._state_lock:
+            state_save(self.state)
+            self._unsaved_marks = 0
+
+    def _image_part(self, jpeg_bytes: bytes) -> dict:
+        return {"type": "input_image", "image_url": jpeg_to_data_url(jpeg_bytes), "detail": self.image_detail}
+
+    def _respond(self, content: list, label: str) -> str:
         resp = self.client.responses.create(
             model=self.model,
             input=[{
                 "role": "user",
-                "content": [
-                    {"type": "input_text", "text": PROMPT},
-                    {"type": "input_image", "image_url": data_url},
-                ],
+                "content": content,
             }],
         )
         usage = getattr(resp, "usage", None)
         if usage is None:
-            log(f"OpenAI response missing usage for {filename}; defaulting token counts to 0")
+            log(f"OpenAI response missing usage for {label}; defaulting token counts to 0")
         self._last_usage = {
             "model": getattr(resp, "model", None) or self.model,
             "input_tokens": usage_int(usage, "input_tokens"),
@@ -655,13 +1197,40 @@ class Pipeline:
 
         ot = getattr(resp, "output_text", "")
         out = ot() if callable(ot) else ot
-        out = (out or "").strip()
+        return (out or "").strip()
+
+    def transcribe_from_jpeg(self, jpeg_bytes: bytes, filename: str) -> dict:
+        self.status_cb(f"Transcribing: {filename}")
+        log(f"Transcribing: {filename}")
+
+        out = self._respond(
+            [
+                {"type": "input_text", "text": PROMPT},
+                self._image_part(jpeg_bytes),
+            ],
+            filename,
+        )
+        return parse_model_json(out)
+
+    def transcribe_batch_from_jpegs(self, jpegs: List[bytes], filenames: List[str]) -> List[dict]:
+        """
+        One Responses call for several images. Raises unless the model returns
+        exactly one result object per image.
+        """
+        label = ", ".join(filenames)
+        self.status_cb(f"Transcribing {len(jpegs)} images: {label}")
+        log(f"Transcribing batch: {label}")
+
+        content = [{"type": "input_text", "text": batch_prompt(len(jpegs))}]
+        content.extend(self._image_part(b) for b in jpegs)
+        data = parse_model_json(self._respond(content, label), key="results")
 
-        start = out.find("{")
-        end = out.rfind("}")
-        if start == -1 or end == -1 or end <= start:
-            raise RuntimeError("Model did not return valid JSON.")
-        return json.loads(out[start:end + 1])
+        results = data.get("results") if isinstance(data, dict) else None
+        if not isinstance(results, list) or len(results) != len(jpegs):
+            raise RuntimeError("Model did not return one result per image.")
+        if not all(isinstance(r, dict) for r in results):
+            raise RuntimeError("Model returned a non-object batch result.")
+        return results
 
     def record_usage(self, filename: str) -> None:
         usage = self._last_usage or {}
@@ -762,17 +1331,20 @@ class Pipeline:
             pass
         return self.page_id
 
-    def process(self, path: Path) -> None:
-        fp = self.fingerprint(path)
-        if self.seen(fp):
-            self.status_cb(f"Already processed: {path.name}")
-            log(f"Already processed: {path}")
-            return
-
-        jpeg_bytes = image_to_jpeg_bytes(path)
+    def _resolve_insert_after(self) -> Optional[str]:
+        """New entries go right after the page's first H1, else after its first block."""
+        try:
+            after_id = self.notion.find_first_h1_id(self.page_id)
+            if not after_id:
+                child_ids = self.notion.list_children_ids(self.page_id, page_size=50)
+                after_id = child_ids[0] if child_ids else None
+            return after_id
+        except Exception as e:
+            log(f"Could not resolve insert-after; fallback to append: {repr(e)}")
+            return None
 
+    def _upload_best_effort(self, path: Path, jpeg_bytes: bytes) -> Optional[str]:
         # Upload image for attachment (best effort)
-        image_file_upload_id = None
         try:
             self.status_cb(f"Uploading image: {path.name}")
             log(f"Uploading image to Notion: {path}")
@@ -783,11 +1355,142 @@ class Pipeline:
                 content_type="image/jpeg",
             )
             log(f"Uploaded image file_upload_id: {image_file_upload_id}")
+            return image_file_upload_id
         except Exception as e:
-            image_file_upload_id = None
             log(f"Image upload failed (continuing without attachment): {repr(e)}")
+            return None
+
+    def _stage(self, path: Path) -> tuple[PreparedImage, Optional[bytes], Optional[Future]]:
+        """
+        Fingerprint and convert one image, and start its Notion upload in the
+        background so it overlaps the transcription call. Returns no JPEG bytes
+        when the image was already processed.
+        """
+        fp, data = self._read_and_fingerprint(path)
+        if self.seen(fp):
+            return PreparedImage(fingerprint=fp, already_processed=True), None, None
+
+        jpeg_bytes = image_to_jpeg_bytes(path, data)
+        upload = self._upload_executor.submit(self._upload_best_effort, path, jpeg_bytes)
+        return PreparedImage(fingerprint=fp), jpeg_bytes, upload
+
+    @staticmethod
+    def _finish_upload(prepared: PreparedImage, upload: Optional[Future]) -> None:
+        if upload is None:
+            return
+        try:
+            prepared.image_file_upload_id = upload.result()
+        except Exception as e:
+            # Cancelled on shutdown; the attachment is optional.
+            log(f"Image upload did not finish (continuing without attachment): {repr(e)}")
+
+    def prepare(self, path: Path) -> PreparedImage:
+        """
+        Fingerprint, convert, upload and transcribe one image.
+        Independent of batch/entry state, so it can run ahead on the worker pool.
+        """
+        prepared, jpeg_bytes, upload = self._stage(path)
+        if jpeg_bytes is None:
+            return prepared
+        try:
+            prepared.parsed = self.transcribe_from_jpeg(jpeg_bytes, path.name)
+            prepared.usage = self._last_usage
+        finally:
+            self._finish_upload(prepared, upload)
+        return prepared
+
+    def _prepare_group(self, paths: List[Path], futures: List[Future]) -> None:
+        """
+        Stage each image, then transcribe the group in one call. Falls back to
+        per-image calls when the batch answer can't be trusted.
+        """
+        staged = []
+        for path, fut in zip(paths, futures):
+            try:
+                prepared, jpeg_bytes, upload = self._stage(path)
+            except Exception as e:
+                fut.set_exception(e)
+                continue
+            if jpeg_bytes is None:
+                fut.set_result(prepared)
+            else:
+                staged.append((path, fut, prepared, jpeg_bytes, upload))
+        if not staged:
+            return
+
+        parsed_list = None
+        usages: List[Optional[dict]] = []
+        if self._closed:
+            # Stopped while staging: close() has dropped these futures, so a
+            # transcription now would be billed and then redone on the next start.
+            for _path, fut, *_rest in staged:
+                fut.cancel()
+            return
+        if len(staged) > 1:
+            try:
+                parsed_list = self.transcribe_batch_from_jpegs(
+                    [s[3] for s in staged],
+                    [s[0].name for s in staged],
+                )
+                usages = split_usage(self._last_usage, len(staged))
+            except Exception as e:
+                parsed_list = None
+                log(f"Batch transcription failed; falling back to per-image calls: {repr(e)}")
+
+        for idx, (path, fut, prepared, jpeg_bytes, upload) in enumerate(staged):
+            if parsed_list is None and self._closed:
+                fut.cancel()
+                continue
+            try:
+                if parsed_list is not None:
+                    prepared.parsed = parsed_list[idx]
+                    prepared.usage = usages[idx]
+                else:
+                    prepared.parsed = self.transcribe_from_jpeg(jpeg_bytes, path.name)
+                    prepared.usage = self._last_usage
+                self._finish_upload(prepared, upload)
+                fut.set_result(prepared)
+            except Exception as e:
+                self._finish_upload(prepared, upload)
+                fut.set_exception(e)
+
+    def prefetch(self, paths: List[Path]) -> None:
+        """
+        Start preparing the given paths on the worker pool, in groups of
+        `transcribe_batch_size`. `process` picks the results up in caller order,
+        so Notion appends stay sequential and deterministic.
+        """
+        with self._prefetch_lock:
+            if self._closed:
+                return
+            todo = [p for p in paths if str(p) not in self._prefetched]
+            for i in range(0, len(todo), self.transcribe_batch_size):
+                group = todo[i:i + self.transcribe_batch_size]
+                futures = [Future() for _ in group]
+                for p, fut in zip(group, futures):
+                    self._prefetched[str(p)] = fut
+                task = self._executor.submit(self._prepare_group, group, futures)
+                task.add_done_callback(functools.partial(_settle_group_futures, futures=futures))
+
+    def _take_prepared(self, path: Path) -> PreparedImage:
+        with self._prefetch_lock:
+            fut = self._prefetched.pop(str(path), None)
+        if fut is None:
+            return self.prepare(path)
+        return fut.result()
+
+    def process(self, path: Path) -> None:
+        prepared = self._take_prepared(path)
+        fp = prepared.fingerprint
+        # Re-check: a duplicate may have been appended while this file was prefetching.
+        if prepared.already_processed or self.seen(fp):
+            self.status_cb(f"Already processed: {path.name}")
+            log(f"Already processed: {path}")
+            return
 
-        parsed = self.transcribe_from_jpeg(jpeg_bytes, path.name)
+        image_file_upload_id = prepared.image_file_upload_id
+        parsed = prepared.parsed
+        self._last_usage = prepared.usage
         file_mtime = path.stat().st_mtime if path.exists() else time.time()
         start_new_entry, continue_active_entry, effective_entry_title = self._effective_entry_for_file(
             parsed,
@@ -843,7 +1546,7 @@ class Pipeline:
                     raise RuntimeError("Merge branch produced empty blocks")
                 return None, None, None
 
-            chunk = 60
+            chunk = NOTION_APPEND_CHUNK
             first_h2_id = None
             last_inserted_id = None
             last_resp = None
@@ -859,7 +1562,6 @@ class Pipeline:
                     if last_new_id:
                         last_inserted_id = last_new_id
                         after_block_id = last_new_id
-                time.sleep(0.1)
             return first_h2_id, last_inserted_id, last_resp
 
         first_h2_block_id = None
@@ -881,15 +1583,7 @@ class Pipeline:
             entry_container_block_id = ctx.active_entry_container_block_id
         else:
             append_target_id = self.resolve_append_parent_id(ctx)
-            after_id = None
-            try:
-                after_id = self.notion.find_first_h1_id(self.page_id)
-                if not after_id:
-                    child_ids = self.notion.list_children_ids(self.page_id, page_size=50)
-                    after_id = child_ids[0] if child_ids else None
-            except Exception as e:
-                after_id = None
-                log(f"Could not resolve insert-after; fallback to append: {repr(e)}")
+            after_id = self._resolve_insert_after()
 
             heading_idx = next((i for i, b in enumerate(blocks) if b.get("type") == "heading_2"), None)
             content_blocks = blocks
@@ -908,14 +1602,30 @@ class Pipeline:
                     "rich_text": [{"type": "text", "text": {"content": " "}}],
                 },
             }
-            first_h2_block_id, _, heading_resp = _append_in_chunks(
-                parent_id=append_target_id,
-                block_list=[heading_block],
-                branch_name="NEW_ENTRY",
-                include_heading=True,
-                after_block_id=after_id,
-                fail_on_empty=False,
-            )
+            try:
+                first_h2_block_id, _, heading_resp = _append_in_chunks(
+                    parent_id=append_target_id,
+                    block_list=[heading_block],
+                    branch_name="NEW_ENTRY",
+                    include_heading=True,
+                    after_block_id=after_id,
+                    fail_on_empty=False,
+                )
+            except Exception as e:
+                # The anchor may be a cached H1 that has since been deleted; the failed
+                # append evicted it, so look it up again and retry once if it moved.
+                retry_after_id = self._resolve_insert_after() if after_id else None
+                if not retry_after_id or retry_after_id == after_id:
+                    raise
+                log(f"Append after {after_id} failed ({repr(e)}); retrying after {retry_after_id}")
+                first_h2_block_id, _, heading_resp = _append_in_chunks(
+                    parent_id=append_target_id,
+                    block_list=[heading_block],
+                    branch_name="NEW_ENTRY",
+                    include_heading=True,
+                    after_block_id=retry_after_id,
+                    fail_on_empty=False,
+                )
             if not first_h2_block_id:
                 first_h2_block_id = extract_first_block_id_by_type_from_append_response(
                     heading_resp or {},
@@ -971,9 +1681,11 @@ class Pipeline:
         elif continue_active_entry and ctx is not None and ctx.active_entry_url:
             note_url = ctx.active_entry_url
         if note_url:
-            self.state["last_note_url"] = note_url
-            self.state["last_note_ts"] = time.time()
-            self.state["last_note_title"] = effective_notify_title or path.name
+            # mark() and flush_state() read/serialize self.state under this lock.
+            with self._state_lock:
+                self.state["last_note_url"] = note_url
+                self.state["last_note_ts"] = time.time()
+                self.state["last_note_title"] = effective_notify_title or path.name
         if ctx is not None:
             ctx.last_file_mtime = file_mtime
             if start_new_entry:
@@ -1006,6 +1718,10 @@ class Pipeline:
         log(f"Done: {path}")
 
 
+# Queue marker for FolderHandler: scan the folder as a startup backlog.
+_BACKLOG = object()
+
+
 class FolderHandler(FileSystemEventHandler):
     def __init__(self, pipeline: Pipeline, watch: Path, status_cb, refresh_menu_cb=None):
         self.pipeline = pipeline
@@ -1016,20 +1732,49 @@ class FolderHandler(FileSystemEventHandler):
         self.fail = watch / "_failed"
         self.proc.mkdir(exist_ok=True)
         self.fail.mkdir(exist_ok=True)
-        self._batch_lock = threading.Lock()
+        # Events only enqueue a wake-up; one worker debounces, scans and processes,
+        # so the observer thread is never blocked by stability polls or API calls.
+        self._queue: queue.Queue = queue.Queue()
+        # Set by stop(): the file in hand finishes, the rest stay in the watch folder.
+        self._stopping = threading.Event()
+        self._worker = threading.Thread(target=self._drain, name="folder-handler", daemon=True)
+        self._worker.start()
+
+    def _wait_until_stable_all(self, paths: List[Path]) -> List[Path]:
+        """
+        Poll every pending file on the same tick, so a burst of N drops settles in
+        one shared window instead of N back-to-back waits. A file is ready once its
+        size has stayed the same for STABLE_QUIET_SECS of polls. Files that vanish or
+        never settle within STABLE_WAIT_MAX_SECS are left out. Keeps the input order.
+        """
+        quiet_polls = max(1, math.ceil(STABLE_QUIET_SECS / STABLE_POLL_SECS))
+        last: Dict[Path, int] = {p: -1 for p in paths}
+        unchanged: Dict[Path, int] = {p: 0 for p in paths}
+        ready = set()
+        for _ in range(int(STABLE_WAIT_MAX_SECS / STABLE_POLL_SECS)):
+            for p in list(last):
+                try:
+                    sz = p.stat().st_size
+                except FileNotFoundError:
+                    del last[p]
+                    continue
+                if sz > 0 and sz == last[p]:
+                    unchanged[p] += 1
+                    if unchanged[p] >= quiet_polls:
+                        ready.add(p)
+                        del last[p]
+                else:
+                    last[p] = sz
+                    unchanged[p] = 0
+            if not last or self._stopping.is_set():
+                break
+            time.sleep(STABLE_POLL_SECS)
+        return [p for p in paths if p in ready]
 
-    def _wait_until_stable(self, path: Path) -> bool:
-        last = -1
-        for _ in range(60):
-            try:
-                sz = path.stat().st_size
-            except FileNotFoundError:
-                return False
-            if sz > 0 and sz == last:
-                return True
-            last = sz
-            time.sleep(0.25)
-        return False
+    def on_closed(self, event):
+        # Emitted when a writer closes the file (inotify); FSEvents has no close
+        # events, so on macOS on_created + the size poll remain the trigger.
+        self.on_created(event)
 
     def on_created(self, event):
         if event.is_directory:
@@ -1041,38 +1786,94 @@ class FolderHandler(FileSystemEventHandler):
         if path.suffix.lower() not in SUPPORTED_EXTS:
             return
 
-        with self._batch_lock:
-            # Debounce near-simultaneous arrivals so they are processed in one batch.
-            time.sleep(WATCH_BATCH_DEBOUNCE_SECS)
-            pending = list_pending_images(self.watch)
-            if not pending:
-                return
-            if hasattr(self.pipeline, "start_batch"):
+        self._queue.put(path)
+
+    def wait_idle(self) -> None:
+        """Block until every wake-up queued so far has been handled."""
+        self._queue.join()
+
+    def stop(self, timeout: Optional[float] = None) -> bool:
+        """
+        Let the worker finish the file in hand, then exit; unprocessed files stay in
+        the watch folder for the next start. Returns False if it is still running.
+        """
+        self._stopping.set()
+        self._queue.put(None)
+        return self.join(timeout=timeout)
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        self._worker.join(timeout=timeout)
+        return not self._worker.is_alive()
+
+    def process_backlog(self) -> None:
+        """Queue one pass over files already in the folder, ignoring the batch window."""
+        self._queue.put(_BACKLOG)
+
+    def _drain(self) -> None:
+        while True:
+            item = self._queue.get()
+            taken = 1
+            stopping = item is None
+            backlog = item is _BACKLOG
+            if not stopping and not backlog:
+                # Debounce near-simultaneous arrivals so they are processed in one batch.
+                time.sleep(WATCH_BATCH_DEBOUNCE_SECS)
+            # Everything queued meanwhile is covered by the single folder scan below.
+            while True:
                 try:
-                    self.pipeline.start_batch(ignore_window=False)
-                except TypeError:
-                    self.pipeline.start_batch()
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                taken += 1
+                stopping = stopping or item is None
+                backlog = backlog or item is _BACKLOG
             try:
-                for p in pending:
-                    if not self._wait_until_stable(p):
-                        continue
-                    try:
-                        self.pipeline.process(p)
-                        p.replace(self.proc / p.name)
-                    except Exception as e:
-                        self.status_cb(f"Error: {e}")
-                        log(f"ERROR processing {p}: {repr(e)}")
-                        try:
-                            p.replace(self.fail / p.name)
-                        except Exception:
-                            pass
-                        notify_failed_image(p, e)
-                    finally:
-                        if self.refresh_menu_cb:
-                            self.refresh_menu_cb()
+                if not stopping:
+                    self._process_pending(ignore_window=backlog)
+            except Exception as e:
+                log(f"ERROR in folder handler: {repr(e)}")
             finally:
-                if hasattr(self.pipeline, "end_batch"):
-                    self.pipeline.end_batch()
+                for _ in range(taken):
+                    self._queue.task_done()
+            if stopping:
+                return
+
+    def _process_pending(self, ignore_window: bool = False) -> None:
+        pending = list_pending_images(self.watch)
+        if not pending:
+            return
+        if hasattr(self.pipeline, "start_batch"):
+            try:
+                self.pipeline.start_batch(ignore_window=ignore_window)
+            except TypeError:
+                self.pipeline.start_batch()
+        try:
+            ready = self._wait_until_stable_all(pending)
+            if self._stopping.is_set():
+                return
+            if hasattr(self.pipeline, "prefetch"):
+                self.pipeline.prefetch(ready)
+            for p in ready:
+                if self._stopping.is_set():
+                    log(f"Stopping: left {p.name} in the watch folder")
+                    continue
+                try:
+                    self.pipeline.process(p)
+                    p.replace(self.proc / p.name)
+                except Exception as e:
+                    self.status_cb(f"Error: {e}")
+                    log(f"ERROR processing {p}: {repr(e)}")
+                    try:
+                        p.replace(self.fail / p.name)
+                    except Exception:
+                        pass
+                    notify_failed_image(p, e)
+                finally:
+                    if self.refresh_menu_cb:
+                        self.refresh_menu_cb()
+        finally:
+            if hasattr(self.pipeline, "end_batch"):
+                self.pipeline.end_batch()
 
 
 class NotesMenuApp(rumps.App):
@@ -1086,6 +1887,13 @@ class NotesMenuApp(rumps.App):
 
         self.status_msg = "Idle"
         self.observer: Optional[Observer] = None
+        self.pipeline: Optional[Pipeline] = None
+        self.handler: Optional[FolderHandler] = None
+        self._closing: Optional[threading.Thread] = None
+        self._cfg: Optional[dict] = None
+        # Worker threads only flag that the menu is stale; a main-thread timer applies it.
+        self._menu_refresh_pending = False
+        self._menu_timer = None
 
         self.mi_start = rumps.MenuItem("Start Watching", callback=self.start_watching)
         self.mi_stop = rumps.MenuItem("Stop Watching", callback=self.stop_watching)
@@ -1138,19 +1946,48 @@ class NotesMenuApp(rumps.App):
         except Exception as e:
             log(f"Auto-start failed: {repr(e)}")
 
+    def _config(self) -> dict:
+        # Menu refreshes run after every processed file; read config.json once and
+        # drop the cache only when setup rewrites it.
+        if getattr(self, "_cfg", None) is None:
+            self._cfg = load_config()
+        return self._cfg
+
+    def _state(self) -> dict:
+        # A running pipeline already holds the state in memory (snapshot + log replayed).
+        pipeline = getattr(self, "pipeline", None)
+        if pipeline is not None and isinstance(getattr(pipeline, "state", None), dict):
+            return pipeline.state
+        return state_load()
+
+    def _request_menu_refresh(self) -> None:
+        # Called from the folder handler's worker after each file; AppKit objects must
+        # only be touched on the main thread, and a burst needs only one refresh.
+        self._menu_refresh_pending = True
+
+    def _flush_menu_refresh(self, _timer=None) -> None:
+        if not self._menu_refresh_pending:
+            return
+        self._menu_refresh_pending = False
+        self._refresh_menu_states()
+
     def _refresh_menu_states(self):
         running = self.observer is not None
-        self.mi_start.state = 1 if running else 0
-        cfg = load_config()
+        state = 1 if running else 0
+        if self.mi_start.state != state:
+            self.mi_start.state = state
+        cfg = self._config()
         watch_folder = cfg.get("WATCH_FOLDER")
         failed_count = get_failed_count(Path(watch_folder).expanduser() if watch_folder else None)
         if failed_count > 0:
-            self.mi_open_watch.title = f"Open Watch Folder — {failed_count} failed"
+            title = f"Open Watch Folder — {failed_count} failed"
         else:
-            self.mi_open_watch.title = "Open Watch Folder"
+            title = "Open Watch Folder"
+        if self.mi_open_watch.title != title:
+            self.mi_open_watch.title = title
 
     def _ensure_config(self) -> Optional[dict]:
-        cfg = load_config()
+        cfg = self._config()
         openai_key = keychain_get("OPENAI_API_KEY")
         notion_token = keychain_get("NOTION_TOKEN")
         if not cfg.get("WATCH_FOLDER") or not cfg.get("NOTION_PAGE_ID") or not openai_key or not notion_token:
@@ -1158,7 +1995,7 @@ class NotesMenuApp(rumps.App):
         return cfg
 
     def setup(self, _):
-        cfg = load_config()
+        cfg = dict(self._config())
 
         w = rumps.Window(
             title="Watch folder path",
@@ -1211,6 +2048,7 @@ class NotesMenuApp(rumps.App):
         cfg["NOTION_PAGE_URL"] = nurl.text.strip()
         cfg["NOTION_PAGE_ID"] = page_id
         save_config(cfg)
+        self._cfg = None
 
         if notion_tok.text.strip():
             keychain_set("NOTION_TOKEN", notion_tok.text.strip())
@@ -1225,7 +2063,13 @@ class NotesMenuApp(rumps.App):
         if self.observer is not None:
             rumps.alert("Already running", "Watcher is already running.")
             return
+        if self._closing is not None and self._closing.is_alive():
+            rumps.alert("Still stopping", "Finishing the current file; try again in a moment.")
+            return
 
+        # Re-read config.json on every start so hand edits (CONCURRENCY, IMAGE_DETAIL,
+        # TRANSCRIBE_BATCH_SIZE) apply after Stop/Start Watching.
+        self._cfg = None
         cfg = self._ensure_config()
         if not cfg:
             rumps.alert("Setup needed", "Click Setup… and paste folder + Notion URL + keys.")
@@ -1243,38 +2087,34 @@ class NotesMenuApp(rumps.App):
                 model=DEFAULT_OPENAI_MODEL,
                 notion_token=notion_token,
                 page_id=cfg["NOTION_PAGE_ID"],
-                status_cb=self.status_cb
+                status_cb=self.status_cb,
+                image_detail=cfg.get("IMAGE_DETAIL", DEFAULT_IMAGE_DETAIL),
+                max_workers=cfg.get("CONCURRENCY", DEFAULT_PIPELINE_WORKERS),
+                transcribe_batch_size=cfg.get("TRANSCRIBE_BATCH_SIZE", DEFAULT_TRANSCRIBE_BATCH_SIZE),
             )
-            handler = FolderHandler(pipeline, watch, self.status_cb, refresh_menu_cb=self._refresh_menu_states)
-
-            # ✅ Batch existing files on startup (before/after watcher start)
+            self.pipeline = pipeline
+            handler = FolderHandler(pipeline, watch, self.status_cb, refresh_menu_cb=self._request_menu_refresh)
+            self.handler = handler
+            self._menu_timer = rumps.Timer(self._flush_menu_refresh, MENU_REFRESH_SECS)
+            self._menu_timer.start()
+
+            # ✅ Batch existing files on startup, on the handler's worker so the menubar stays
+            # responsive; watcher events queue up behind it and keep notes in order.
             try:
                 pending = list_pending_images(watch)
                 if pending:
                     self.status_cb(f"Batch processing {len(pending)} file(s)…")
                     log(f"Batch startup: {len(pending)} file(s)")
-                    pipeline.start_batch(ignore_window=True)
-                    try:
-                        for p in pending:
-                            try:
-                                pipeline.process(p)
-                                p.replace(handler.proc / p.name)
-                            except Exception as e:
-                                self.status_cb(f"Error: {e}")
-                                log(f"ERROR batch processing {p}: {repr(e)}")
-                                try:
-                                    p.replace(handler.fail / p.name)
-                                except Exception:
-                                    pass
-                                notify_failed_image(p, e)
-                            finally:
-                                self._refresh_menu_states()
-                    finally:
-                        pipeline.end_batch()
+                    handler.process_backlog()
             except Exception as e:
                 log(f"Batch startup failed (ignored): {repr(e)}")
 
-            self.observer = Observer()
+            if is_network_volume(watch):
+                # Changes made by other machines never reach FSEvents on a share; poll instead.
+                log(f"Watch folder is on a network volume; polling every {POLLING_OBSERVER_SECS}s")
+                self.observer = PollingObserver(timeout=POLLING_OBSERVER_SECS)
+            else:
+                self.observer = Observer()
             self.observer.schedule(handler, str(watch), recursive=False)
             self.observer.start()
 
@@ -1282,6 +2122,8 @@ class NotesMenuApp(rumps.App):
             log(f"Watching: {watch}")
         except Exception as e:
             self.observer = None
+            self._stop_handler(timeout=0)
+            self._close_pipeline()
             log(f"Could not start watcher: {repr(e)}")
             rumps.alert("Could not start", str(e))
         finally:
@@ -1292,21 +2134,58 @@ class NotesMenuApp(rumps.App):
             rumps.alert("Not running", "Watcher is not running.")
             return
 
+        handler = None
         try:
             self.observer.stop()
             self.observer.join(timeout=5)
+            handler = self._stop_handler(timeout=5)
         finally:
             self.observer = None
+            self._close_pipeline(after=handler)
             self.status_msg = "Stopped."
             log("Stopped watcher")
             rumps.notification(APP_NAME, "Stopped", "")
             self._refresh_menu_states()
 
+    def _stop_handler(self, timeout: float) -> Optional[FolderHandler]:
+        """Stop the folder handler; returns it if its worker is still finishing a file."""
+        handler, self.handler = getattr(self, "handler", None), None
+        timer, self._menu_timer = getattr(self, "_menu_timer", None), None
+        if timer is not None:
+            timer.stop()
+        if handler is not None and hasattr(handler, "stop"):
+            if handler.stop(timeout=timeout) is False:
+                return handler
+        return None
+
+    def _close_pipeline(self, after: Optional[FolderHandler] = None) -> None:
+        pipeline, self.pipeline = self.pipeline, None
+        if pipeline is None or not hasattr(pipeline, "close"):
+            return
+        if after is None:
+            self._close_pipeline_now(pipeline)
+            return
+        # The worker is still inside process(); shutting the executors down under it
+        # would fail the file it holds. Close once it has exited.
+        def _close_when_idle():
+            after.join()
+            self._close_pipeline_now(pipeline)
+
+        self._closing = threading.Thread(target=_close_when_idle, name="pipeline-close", daemon=True)
+        self._closing.start()
+
+    @staticmethod
+    def _close_pipeline_now(pipeline: Pipeline) -> None:
+        try:
+            pipeline.close()
+        except Exception as e:
+            log(f"Pipeline close failed (ignored): {repr(e)}")
+
     def show_status(self, _):
         rumps.alert("Status", self.status_msg or "—")
 
     def open_last_note(self, _):
-        st = state_load()
+        st = self._state()
         url = st.get("last_note_url")
         if not url:
             rumps.alert("No note yet", "No processed note in this session")
@@ -1315,7 +2194,7 @@ class NotesMenuApp(rumps.App):
 
     def open_watch_folder(self, _):
         self._refresh_menu_states()
-        cfg = load_config()
+        cfg = self._config()
         p = cfg.get("WATCH_FOLDER")
         if p:
             subprocess.run(["open", p])
@@ -1324,9 +2203,9 @@ class NotesMenuApp(rumps.App):
         subprocess.run(["open", str(LOG_FILE)])
 
     def about(self, _):
-        cfg = load_config()
+        cfg = self._config()
         watch_folder = cfg.get("WATCH_FOLDER") or "—"
-        st = state_load()
+        st = self._state()
         processed = st.get("processed", {})
         processed_count = len(processed) if isinstance(processed, dict) else 0
         usage_data = usage_load(USAGE_PATH)
@@ -1354,6 +2233,19 @@ class NotesMenuApp(rumps.App):
             if self.observer is not None:
                 self.observer.stop()
                 self.observer.join(timeout=2)
+            handler = self._stop_handler(timeout=2)
+            if handler is None:
+                self._close_pipeline()
+            else:
+                # The worker is still inside process() and the app is exiting: leave the
+                # executors running so the file in hand is not failed into _failed (it
+                # stays in the watch folder), and only persist what is already marked.
+                pipeline, self.pipeline = self.pipeline, None
+                if pipeline is not None and hasattr(pipeline, "flush_state"):
+                    try:
+                        pipeline.flush_state()
+                    except Exception as e:
+                        log(f"State flush on quit failed (ignored): {repr(e)}")
         finally:
             log("Quit")
             rumps.quit_application()
@@ -26,6 +26,10 @@ def rt_text(s: str):
     return [{"type": "text", "text": {"content": s}}]
 
 
+def _block(block_type: str, body: Dict[str, Any]) -> Dict[str, Any]:
+    return {"object": "block", "type": block_type, block_type: body}
+
+
 def strip_known_prefix(s: str) -> str:
     """
     Defensive cleanup: remove known handwritten-annotation prefixes if they leak into
@@ -177,11 +181,7 @@ def build_notion_blocks(
 
     def _make_list_item(kind: str, text: str) -> Dict[str, Any]:
         block_type = "numbered_list_item" if kind == "numbered" else "bulleted_list_item"
-        return {
-            "object": "block",
-            "type": block_type,
-            block_type: {"rich_text": rt_text(text)},
-        }
+        return _block(block_type, {"rich_text": rt_text(text)})
 
     def _build_nested_note_blocks(notes: List[str]) -> List[Dict[str, Any]]:
         list_blocks: List[Dict[str, Any]] = []
@@ -349,54 +349,37 @@ def build_notion_blocks(
             section_title = section["title"]
             if idx == 0 and entry_title_override:
                 section_title = entry_title_override
-            blocks.append({
-                "object": "block",
-                "type": "heading_2",
-                "heading_2": {"rich_text": date_mention_rich_text(now) + rt_text(f" — {section_title}")}
-            })
+            blocks.append(_block(
+                "heading_2",
+                {"rich_text": date_mention_rich_text(now) + rt_text(f" — {section_title}")},
+            ))
 
         # Attach image (or Source text) only once, on the first section
         if idx == 0:
             if image_upload_id:
-                blocks.append({
-                    "object": "block",
-                    "type": "image",
-                    "image": {
-                        "caption": rt_text(f"Source image: {filename}"),
-                        "type": "file_upload",
-                        "file_upload": {"id": image_upload_id},
-                    }
-                })
+                blocks.append(_block("image", {
+                    "caption": rt_text(f"Source image: {filename}"),
+                    "type": "file_upload",
+                    "file_upload": {"id": image_upload_id},
+                }))
             else:
-                blocks.append({
-                    "object": "block",
-                    "type": "paragraph",
-                    "paragraph": {"rich_text": rt_text(f"Source: {filename}")}
-                })
+                blocks.append(_block("paragraph", {"rich_text": rt_text(f"Source: {filename}")}))
 
-        blocks.append({"object": "block", "type": "divider", "divider": {}})
+        blocks.append(_block("divider", {}))
 
         for t in section.get("topics", []):
             title = t["title"]
-            blocks.append({
-                "object": "block",
-                "type": "heading_3",
-                "heading_3": {"rich_text": rt_text(title)}
-            })
+            blocks.append(_block("heading_3", {"rich_text": rt_text(title)}))
 
             # Tasks
             for task in (t.get("tasks") or []):
                 text = (task.get("text") or "").strip()
                 if not text:
                     continue
-                blocks.append({
-                    "object": "block",
-                    "type": "to_do",
-                    "to_do": {
-                        "rich_text": rt_text(text),
-                        "checked": bool(task.get("done", False)),
-                    }
-                })
+                blocks.append(_block("to_do", {
+                    "rich_text": rt_text(text),
+                    "checked": bool(task.get("done", False)),
+                }))
 
             # Notes: nested list rendering based only on explicit prefix rules.
             blocks.extend(_build_nested_note_blocks(t.get("notes") or []))
@@ -406,10 +389,6 @@ def build_notion_blocks(
                 q = (q or "").strip()
                 if not q:
                     continue
-                blocks.append({
-                    "object": "block",
-                    "type": "bulleted_list_item",
-                    "bulleted_list_item": {"rich_text": rt_text(f"❓ {q}")}
-                })
+                blocks.append(_block("bulleted_list_item", {"rich_text": rt_text(f"❓ {q}")}))
 
     return blocks
@@ -44,4 +44,19 @@ Output ONLY valid JSON:
     }
   ]
 }
-""".strip()
\ No newline at end of file
+""".strip()
+
+BATCH_PROMPT_SUFFIX = r"""
+The user message contains {count} images, one handwritten page each, in order.
+Apply the rules above to each image independently; never move content between images.
+
+Output ONLY valid JSON:
+{{
+  "results": [ <one object per image, in input order, shaped exactly like the single-image output above> ]
+}}
+"results" MUST contain exactly {count} items.
+""".strip()
+
+
+def batch_prompt(count: int) -> str:
+    return PROMPT + "\n\n" + BATCH_PROMPT_SUFFIX.format(count=int(count))
@@ -1,3 +1,5 @@
+import pytest
+
 import menubar_notes_to_notion as appmod
 
 
@@ -27,3 +29,123 @@ def test_chunking_updates_after_id(monkeypatch):
             after_id = results[0]["id"]
 
     assert calls == ["H1", "new_1", "new_2"]
+
+
+def test_process_appends_content_in_notion_sized_chunks(monkeypatch, tmp_path):
+    img = tmp_path / "IMG_LONG.HEIC"
+    img.write_bytes(b"fake")
+    monkeypatch.setattr(appmod.Pipeline, "seen", lambda self, fp: False)
+    monkeypatch.setattr(appmod.Pipeline, "mark", lambda self, fp, name: None)
+    monkeypatch.setattr(appmod.Pipeline, "record_usage", lambda self, filename: None)
+    monkeypatch.setattr(appmod, "image_to_jpeg_bytes", lambda p, _data=None: b"jpeg")
+    monkeypatch.setattr(appmod, "notify_processed_image", lambda *args, **kwargs: None)
+    monkeypatch.setattr(
+        appmod.Pipeline,
+        "transcribe_from_jpeg",
+        lambda self, jpeg, fname: {
+            "topics": [{"title": "General", "tasks": [], "notes": [f"note {i}" for i in range(150)], "questions": []}]
+        },
+    )
+
+    calls = []
+
+    class FakeNotion:
+        def upload_image_bytes(self, filename, data, content_type="image/jpeg"):
+            return None
+
+        def find_first_h1_id(self, page_id, page_size=50):
+            return None
+
+        def list_children_ids(self, block_id, page_size=50):
+            return []
+
+        def append_children(self, block_id, children, after_block_id=None):
+            calls.append((block_id, len(children), after_block_id))
+            return {"results": [{"id": f"new_{len(calls)}"}]}
+
+        def resolve_parent_page_id(self, block_id):
+            return None
+
+    p = appmod.Pipeline(
+        openai_key="x",
+        model="gpt-5-mini",
+        notion_token="y",
+        page_id="PAGE",
+        status_cb=lambda _msg: None,
+    )
+    p.notion = FakeNotion()
+    p.process(img)
+
+    content_calls = [c for c in calls if c[0] == "new_2"]
+    assert [n for _, n, _ in content_calls] == [appmod.NOTION_APPEND_CHUNK, 153 - appmod.NOTION_APPEND_CHUNK]
+    assert content_calls[1][2] == "new_3"
+
+
+def _anchor_pipeline(monkeypatch, tmp_path, notion):
+    monkeypatch.setattr(appmod.Pipeline, "seen", lambda self, fp: False)
+    monkeypatch.setattr(appmod.Pipeline, "mark", lambda self, fp, name: None)
+    monkeypatch.setattr(appmod.Pipeline, "record_usage", lambda self, filename: None)
+    monkeypatch.setattr(appmod, "image_to_jpeg_bytes", lambda p, _data=None: b"jpeg")
+    monkeypatch.setattr(appmod, "notify_processed_image", lambda *args, **kwargs: None)
+    monkeypatch.setattr(appmod, "log", lambda msg: None)
+    monkeypatch.setattr(
+        appmod.Pipeline,
+        "transcribe_from_jpeg",
+        lambda self, jpeg, fname: {
+            "topics": [{"title": "General", "tasks": [], "notes": ["note"], "questions": []}]
+        },
+    )
+    p = appmod.Pipeline(
+        openai_key="x",
+        model="gpt-5-mini",
+        notion_token="y",
+        page_id="PAGE",
+        status_cb=lambda _msg: None,
+    )
+    p.notion = notion
+    return p
+
+
+class _AnchorNotion:
+    def __init__(self, h1_ids):
+        self.h1_ids = list(h1_ids)
+        self.calls = []
+
+    def upload_image_bytes(self, filename, data, content_type="image/jpeg"):
+        return None
+
+    def find_first_h1_id(self, page_id, page_size=50):
+        return self.h1_ids.pop(0) if len(self.h1_ids) > 1 else self.h1_ids[0]
+
+    def list_children_ids(self, block_id, page_size=50):
+        return []
+
+    def append_children(self, block_id, children, after_block_id=None):
+        self.calls.append(after_block_id)
+        if after_block_id == "DELETED_H1":
+            raise RuntimeError("Notion append error 400: block not found")
+        return {"results": [{"id": f"new_{len(self.calls)}"}]}
+
+    def resolve_parent_page_id(self, block_id):
+        return None
+
+
+def test_new_entry_append_relooks_up_deleted_h1_and_retries_once(monkeypatch, tmp_path):
+    img = tmp_path / "IMG_ANCHOR.HEIC"
+    img.write_bytes(b"fake")
+    notion = _AnchorNotion(["DELETED_H1", "LIVE_H1"])
+
+    _anchor_pipeline(monkeypatch, tmp_path, notion).process(img)
+
+    assert notion.calls[:2] == ["DELETED_H1", "LIVE_H1"]
+
+
+def test_new_entry_append_failure_with_unchanged_anchor_is_not_retried(monkeypatch, tmp_path):
+    img = tmp_path / "IMG_ANCHOR.HEIC"
+    img.write_bytes(b"fake")
+    notion = _AnchorNotion(["DELETED_H1"])
+
+    with pytest.raises(RuntimeError):
+        _anchor_pipeline(monkeypatch, tmp_path, notion).process(img)
+
+    assert notion.calls == ["DELETED_H1"]
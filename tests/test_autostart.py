@@ -195,7 +195,7 @@ def test_start_watching_uses_default_openai_model(monkeypatch, tmp_path):
     used = {"model": None}
 
     class DummyPipeline:
-        def __init__(self, openai_key, model, notion_token, page_id, status_cb):
+        def __init__(self, openai_key, model, notion_token, page_id, status_cb, **_kwargs):
             used["model"] = model
 
     class DummyFolderHandler:
@@ -259,3 +259,160 @@ def test_about_includes_version_model_and_usage(monkeypatch):
     assert m is not None
     assert int(m.group(1)) >= 0
     assert "Estimated cost (lifetime): $0.12" in captured["msg"]
+
+
+def test_menu_refreshes_reuse_cached_config(monkeypatch, tmp_path):
+    _patch_rumps_headless(monkeypatch)
+
+    watch = tmp_path / "watch"
+    watch.mkdir()
+    loads = {"n": 0}
+
+    def fake_load_config():
+        loads["n"] += 1
+        return {"WATCH_FOLDER": str(watch)}
+
+    monkeypatch.setattr(appmod, "load_config", fake_load_config)
+    monkeypatch.setattr(appmod.NotesMenuApp, "_ensure_config", lambda self: None)
+    monkeypatch.setattr(appmod, "log", lambda msg: None)
+    monkeypatch.setattr(appmod.subprocess, "run", lambda cmd: None)
+
+    app = appmod.NotesMenuApp()
+    app._refresh_menu_states()
+    app.open_watch_folder(None)
+
+    assert loads["n"] == 1
+
+
+def test_worker_menu_refresh_requests_coalesce_on_timer(monkeypatch, tmp_path):
+    _patch_rumps_headless(monkeypatch)
+    monkeypatch.setattr(appmod, "load_config", lambda: {})
+    monkeypatch.setattr(appmod.NotesMenuApp, "_ensure_config", lambda self: None)
+    monkeypatch.setattr(appmod, "log", lambda msg: None)
+
+    app = appmod.NotesMenuApp()
+    refreshes = {"n": 0}
+    monkeypatch.setattr(app, "_refresh_menu_states", lambda: refreshes.__setitem__("n", refreshes["n"] + 1))
+
+    for _ in range(5):
+        app._request_menu_refresh()
+    app._flush_menu_refresh(None)
+    app._flush_menu_refresh(None)
+
+    assert refreshes["n"] == 1
+
+
+def test_stop_watching_closes_pipeline_only_after_worker_exits(monkeypatch):
+    _patch_rumps_headless(monkeypatch)
+    monkeypatch.setattr(appmod, "load_config", lambda: {})
+    monkeypatch.setattr(appmod.NotesMenuApp, "_ensure_config", lambda self: None)
+    monkeypatch.setattr(appmod, "log", lambda msg: None)
+    monkeypatch.setattr(appmod.rumps, "notification", lambda *a, **k: None, raising=False)
+
+    finish = appmod.threading.Event()
+    closed = appmod.threading.Event()
+
+    class BusyHandler:
+        def stop(self, timeout=None):
+            return False
+
+        def join(self, timeout=None):
+            return finish.wait(timeout=5)
+
+    class DummyPipeline:
+        def close(self):
+            closed.set()
+
+    class DummyObserver:
+        def stop(self):
+            pass
+
+        def join(self, timeout=None):
+            pass
+
+    app = appmod.NotesMenuApp()
+    app.observer = DummyObserver()
+    app.handler = BusyHandler()
+    app.pipeline = DummyPipeline()
+
+    app.stop_watching(None)
+
+    assert app.pipeline is None
+    assert not closed.is_set()
+    finish.set()
+    assert closed.wait(timeout=5)
+
+
+def test_start_watching_rereads_config_edited_by_hand(monkeypatch, tmp_path):
+    _patch_rumps_headless(monkeypatch)
+
+    watch = tmp_path / "watch"
+    on_disk = {"WATCH_FOLDER": str(watch), "NOTION_PAGE_ID": "PAGEID", "CONCURRENCY": 2}
+
+    monkeypatch.setattr(appmod, "load_config", lambda: dict(on_disk))
+    monkeypatch.setattr(appmod, "keychain_get", lambda name: "token")
+    monkeypatch.setattr(appmod, "log", lambda msg: None)
+    monkeypatch.setattr(appmod.rumps, "alert", lambda *args: None)
+    monkeypatch.setattr(appmod, "list_pending_images", lambda watch_path: [])
+    monkeypatch.setattr(appmod, "is_network_volume", lambda path: False)
+
+    workers = []
+
+    class DummyPipeline:
+        def __init__(self, openai_key, model, notion_token, page_id, status_cb, max_workers=None, **_kwargs):
+            workers.append(max_workers)
+
+    class DummyFolderHandler:
+        def __init__(self, pipeline, watch, status_cb, refresh_menu_cb=None):
+            pass
+
+    class DummyObserver:
+        def schedule(self, handler, path, recursive=False):
+            return None
+
+        def start(self):
+            return None
+
+    monkeypatch.setattr(appmod, "Pipeline", DummyPipeline)
+    monkeypatch.setattr(appmod, "FolderHandler", DummyFolderHandler)
+    monkeypatch.setattr(appmod, "Observer", lambda: DummyObserver())
+
+    app = appmod.NotesMenuApp()
+    app.start_watching(None)
+    app.observer = None
+    on_disk["CONCURRENCY"] = 6
+    app.start_watching(None)
+
+    assert workers == [2, 6]
+
+
+def test_quit_with_busy_worker_flushes_state_without_closing_pipeline(monkeypatch):
+    _patch_rumps_headless(monkeypatch)
+    monkeypatch.setattr(appmod, "load_config", lambda: {})
+    monkeypatch.setattr(appmod.NotesMenuApp, "_ensure_config", lambda self: None)
+    monkeypatch.setattr(appmod, "log", lambda msg: None)
+    quits = []
+    monkeypatch.setattr(appmod.rumps, "quit_application", lambda: quits.append(1), raising=False)
+
+    calls = []
+
+    class BusyHandler:
+        def stop(self, timeout=None):
+            return False
+
+    class DummyPipeline:
+        def close(self):
+            calls.append("close")
+
+        def flush_state(self):
+            calls.append("flush_state")
+
+    app = appmod.NotesMenuApp()
+    app.handler = BusyHandler()
+    app.pipeline = DummyPipeline()
+
+    app.quit_app(None)
+
+    assert calls == ["flush_state"]
+    assert app.pipeline is None
+    assert quits == [1]
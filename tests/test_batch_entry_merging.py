@@ -48,7 +48,7 @@ def _make_pipeline(monkeypatch, tmp_path: Path, parsed_by_name: dict):
     monkeypatch.setattr(appmod, "USAGE_PATH", tmp_path / "usage.json")
     monkeypatch.setattr(appmod.Pipeline, "seen", lambda self, fp: False)
     monkeypatch.setattr(appmod.Pipeline, "mark", lambda self, fp, name: None)
-    monkeypatch.setattr(appmod, "image_to_jpeg_bytes", lambda p: b"jpeg")
+    monkeypatch.setattr(appmod, "image_to_jpeg_bytes", lambda p, _data=None: b"jpeg")
     monkeypatch.setattr(appmod, "notify_processed_image", lambda *args, **kwargs: None)
     monkeypatch.setattr(appmod.time, "sleep", lambda _n: None)
 
@@ -355,6 +355,8 @@ def test_watcher_batch_processing_uses_deterministic_sorted_order(monkeypatch, t
 
     handler.on_created(Event())
 
+    handler.wait_idle()
+
     assert processed == ["a.png", "b.png"]
 
 
@@ -402,7 +404,7 @@ def test_separate_watcher_events_within_window_reuse_same_h2(monkeypatch, tmp_pa
     monkeypatch.setattr(appmod, "USAGE_PATH", tmp_path / "usage.json")
     monkeypatch.setattr(appmod.Pipeline, "seen", lambda self, fp: False)
     monkeypatch.setattr(appmod.Pipeline, "mark", lambda self, fp, name: None)
-    monkeypatch.setattr(appmod, "image_to_jpeg_bytes", lambda p: b"jpeg")
+    monkeypatch.setattr(appmod, "image_to_jpeg_bytes", lambda p, _data=None: b"jpeg")
     monkeypatch.setattr(appmod, "notify_processed_image", lambda *args, **kwargs: None)
     monkeypatch.setattr(appmod.time, "sleep", lambda _n: None)
 
@@ -433,6 +435,8 @@ def test_separate_watcher_events_within_window_reuse_same_h2(monkeypatch, tmp_pa
 
     handler.on_created(Event1())
 
+    handler.wait_idle()
+
     second = tmp_path / "IMG_1001.png"
     second.write_bytes(b"x")
     _set_mtime(second, 1700000030.0)
@@ -443,6 +447,8 @@ def test_separate_watcher_events_within_window_reuse_same_h2(monkeypatch, tmp_pa
 
     handler.on_created(Event2())
 
+    handler.wait_idle()
+
     h2s = [b for b in _flatten_children(pipeline.notion.calls) if b.get("type") == "heading_2"]
     assert len(h2s) == 1
     assert all(c["block_id"] != "id-1" for c in pipeline.notion.calls[2:])
@@ -36,3 +36,37 @@ def test_list_pending_images_filters_and_sorts(tmp_path: Path):
 
     # Assert
     assert [p.name for p in pending] == ["a.png", "b.heic"]
+
+
+def test_list_pending_images_skips_directories_with_image_suffix(tmp_path: Path):
+    (tmp_path / "album.jpg").mkdir()
+    (tmp_path / "IMG_2.heic").write_bytes(b"x")
+
+    assert [p.name for p in appmod.list_pending_images(tmp_path)] == ["IMG_2.heic"]
+
+
+def test_process_backlog_runs_on_worker_with_window_ignored(monkeypatch, tmp_path: Path):
+    (tmp_path / "IMG_1.heic").write_bytes(b"x")
+    (tmp_path / "IMG_2.heic").write_bytes(b"x")
+    sleeps = []
+    monkeypatch.setattr(appmod.time, "sleep", lambda n: sleeps.append(n))
+    calls = []
+
+    class DummyPipeline:
+        def start_batch(self, ignore_window=False):
+            calls.append(("start", ignore_window))
+
+        def process(self, path):
+            calls.append(("process", path.name))
+
+        def end_batch(self):
+            calls.append(("end",))
+
+    handler = appmod.FolderHandler(DummyPipeline(), tmp_path, lambda _msg: None)
+    handler.process_backlog()
+    handler.wait_idle()
+    handler.stop(timeout=5)
+
+    assert calls == [("start", True), ("process", "IMG_1.heic"), ("process", "IMG_2.heic"), ("end",)]
+    assert appmod.WATCH_BATCH_DEBOUNCE_SECS not in sleeps
+    assert sorted(p.name for p in (tmp_path / "_processed").iterdir()) == ["IMG_1.heic", "IMG_2.heic"]
@@ -31,7 +31,7 @@ class _FakeResponsesAPI:
 
 
 class _FakeOpenAI:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, **_kwargs):
         self.api_key = api_key
         self.responses = _FakeResponsesAPI()
 
@@ -76,7 +76,7 @@ def test_deterministic_watch_flow_with_fake_clients(monkeypatch, tmp_path: Path)
     monkeypatch.setattr(appmod, "STATE_PATH", state_path)
     monkeypatch.setattr(appmod, "USAGE_PATH", usage_path)
     monkeypatch.setattr(appmod.time, "sleep", lambda _n: None)
-    monkeypatch.setattr(appmod, "image_to_jpeg_bytes", lambda _p: b"jpegbytes")
+    monkeypatch.setattr(appmod, "image_to_jpeg_bytes", lambda _p, _data=None: b"jpegbytes")
     monkeypatch.setattr(appmod, "OpenAI", _FakeOpenAI)
     monkeypatch.setattr(appmod, "NotionClient", lambda token: fake_notion)
 
@@ -105,6 +105,8 @@ def test_deterministic_watch_flow_with_fake_clients(monkeypatch, tmp_path: Path)
 
     handler.on_created(Event())
 
+    handler.wait_idle()
+
     assert (watch / "_processed" / "IMG_5000.png").exists()
     assert not img.exists()
 
@@ -120,7 +122,7 @@ def test_deterministic_watch_flow_with_fake_clients(monkeypatch, tmp_path: Path)
     assert usage["events"][0]["input_tokens"] == 123
     assert usage["events"][0]["output_tokens"] == 45
 
-    state = json.loads(state_path.read_text("utf-8"))
+    state = appmod.state_load()
     assert "last_note_url" in state
     assert state["last_note_url"].startswith("https://www.notion.so/")
 
@@ -0,0 +1,35 @@
+import pytest
+
+import menubar_notes_to_notion as appmod
+
+
+def test_extracts_dashed_uuid_from_notion_url():
+    url = "https://www.notion.so/Meeting-Notes-0123456789abcdef0123456789ABCDEF?pvs=4"
+    assert appmod.extract_notion_page_id(url) == "01234567-89ab-cdef-0123-456789abcdef"
+
+
+def test_accepts_already_dashed_id():
+    raw = "01234567-89ab-cdef-0123-456789abcdef"
+    assert appmod.extract_notion_page_id(raw) == raw
+
+
+def test_rejects_input_without_page_id():
+    with pytest.raises(ValueError):
+        appmod.extract_notion_page_id("https://www.notion.so/no-id-here")
+
+
+def test_title_ending_in_hex_letters_is_not_glued_onto_id():
+    url = "https://www.notion.so/workspace/Cafe-0123456789abcdef0123456789abcdef"
+    assert appmod.extract_notion_page_id(url) == "01234567-89ab-cdef-0123-456789abcdef"
+
+
+def test_bare_id_with_trailing_slash():
+    assert (
+        appmod.extract_notion_page_id("0123456789abcdef0123456789abcdef/")
+        == "01234567-89ab-cdef-0123-456789abcdef"
+    )
+
+
+def test_dashed_id_after_title_slug():
+    url = "https://www.notion.so/Cafe-01234567-89ab-cdef-0123-456789abcdef"
+    assert appmod.extract_notion_page_id(url) == "01234567-89ab-cdef-0123-456789abcdef"
@@ -0,0 +1,60 @@
+import hashlib
+from pathlib import Path
+
+import menubar_notes_to_notion as appmod
+
+
+def _pipeline():
+    return appmod.Pipeline(
+        openai_key="x",
+        model="gpt-5-mini",
+        notion_token="y",
+        page_id="PAGEID",
+        status_cb=lambda _msg: None,
+    )
+
+
+def test_read_and_fingerprint_matches_sha256_of_file_contents(tmp_path: Path):
+    src = tmp_path / "IMG_0001.HEIC"
+    data = bytes(range(256)) * 5000
+    src.write_bytes(data)
+
+    fp, read = _pipeline()._read_and_fingerprint(src)
+
+    assert fp == hashlib.sha256(data).hexdigest()
+    assert read == data
+
+
+def test_read_and_fingerprint_skips_reread_for_unchanged_file(monkeypatch, tmp_path: Path):
+    src = tmp_path / "IMG_0002.HEIC"
+    src.write_bytes(b"first")
+    p = _pipeline()
+    reads = []
+    real_read_bytes = Path.read_bytes
+    monkeypatch.setattr(Path, "read_bytes", lambda self: reads.append(self) or real_read_bytes(self))
+
+    first, data = p._read_and_fingerprint(src)
+    assert data == b"first"
+    assert p._read_and_fingerprint(src) == (first, None)
+    assert len(reads) == 1
+
+    src.write_bytes(b"second, longer")
+    assert p._read_and_fingerprint(src) == (hashlib.sha256(b"second, longer").hexdigest(), b"second, longer")
+    assert len(reads) == 2
+
+
+def test_stage_reads_new_file_once_and_hands_bytes_to_decoder(monkeypatch, tmp_path: Path):
+    src = tmp_path / "IMG_0003.HEIC"
+    src.write_bytes(b"raw heic bytes")
+    p = _pipeline()
+    decoded = []
+    monkeypatch.setattr(appmod, "image_to_jpeg_bytes", lambda path, data=None: decoded.append(data) or b"jpeg")
+    monkeypatch.setattr(appmod.Pipeline, "_upload_best_effort", lambda self, path, jpeg: None)
+
+    prepared, jpeg, upload = p._stage(src)
+    upload.result()
+    p.close()
+
+    assert prepared.fingerprint == hashlib.sha256(b"raw heic bytes").hexdigest()
+    assert jpeg == b"jpeg"
+    assert decoded == [b"raw heic bytes"]
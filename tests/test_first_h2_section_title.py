@@ -0,0 +1,22 @@
+import menubar_notes_to_notion as appmod
+
+
+def _h2(*parts):
+    return {
+        "type": "heading_2",
+        "heading_2": {"rich_text": [{"type": "text", "text": {"content": p}} for p in parts]},
+    }
+
+
+def test_returns_first_h2_text_without_leading_dash():
+    blocks = [{"type": "paragraph"}, _h2("— ", "Weekly sync"), _h2("Later")]
+    assert appmod.first_h2_section_title(blocks) == "Weekly sync"
+
+
+def test_ascii_dash_is_stripped_too():
+    assert appmod.first_h2_section_title([_h2("- Standup")]) == "Standup"
+
+
+def test_empty_heading_gives_none():
+    assert appmod.first_h2_section_title([_h2("  ")]) is None
+    assert appmod.first_h2_section_title([]) is None
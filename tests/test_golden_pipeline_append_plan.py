@@ -76,7 +76,7 @@ def test_pipeline_append_sequence_matches_golden(monkeypatch, tmp_path: Path):
     monkeypatch.setattr(appmod, "USAGE_PATH", tmp_path / "usage.json")
     monkeypatch.setattr(appmod, "STATE_PATH", tmp_path / "processed.json")
     monkeypatch.setattr(appmod.time, "sleep", lambda _n: None)
-    monkeypatch.setattr(appmod, "image_to_jpeg_bytes", lambda _p: b"jpeg")
+    monkeypatch.setattr(appmod, "image_to_jpeg_bytes", lambda _p, _data=None: b"jpeg")
     monkeypatch.setattr(appmod, "notify_processed_image", lambda *args, **kwargs: None)
     monkeypatch.setattr(appmod.Pipeline, "record_usage", lambda self, filename: None)
     monkeypatch.setattr(appmod.Pipeline, "seen", lambda self, fp: False)
@@ -1,6 +1,7 @@
 import io
 from pathlib import Path
 
+import pytest
 from PIL import Image
 
 import menubar_notes_to_notion as appmod
@@ -34,3 +35,129 @@ def test_small_image_is_not_resized(tmp_path: Path):
     img = Image.open(io.BytesIO(out))
 
     assert img.size == (1200, 800)
+
+
+def test_max_edge_comes_from_app_contract(monkeypatch, tmp_path: Path):
+    src = tmp_path / "tall.png"
+    Image.new("RGB", (1000, 3000), color=(5, 5, 5)).save(src, format="PNG")
+    monkeypatch.setattr(appmod, "IMAGE_MAX_EDGE_PX", 1500)
+
+    out = appmod.image_to_jpeg_bytes(src)
+    img = Image.open(io.BytesIO(out))
+
+    assert img.size == (500, 1500)
+
+
+def test_jpeg_to_data_url_roundtrips():
+    import base64
+
+    data = bytes(range(256)) * 3
+    url = appmod.jpeg_to_data_url(data)
+
+    assert url.startswith("data:image/jpeg;base64,")
+    assert base64.b64decode(url.split(",", 1)[1]) == data
+
+
+def test_heic_is_decoded_to_jpeg(tmp_path: Path):
+    if not appmod.HEIC_OK:
+        pytest.skip("pillow_heif not available")
+    src = tmp_path / "IMG_0001.HEIC"
+    Image.new("RGBA", (2000, 1000), color=(10, 200, 30, 255)).save(src, format="HEIF")
+
+    out = appmod.image_to_jpeg_bytes(src)
+    img = Image.open(io.BytesIO(out))
+
+    assert img.format == "JPEG"
+    assert img.mode == "RGB"
+    assert img.size == (1800, 900)
+
+
+def test_heic_without_pillow_heif_uses_imageio_before_sips(monkeypatch, tmp_path: Path):
+    src = tmp_path / "IMG_0006.HEIC"
+    src.write_bytes(b"heic")
+    buf = io.BytesIO()
+    Image.new("RGB", (2400, 1200), color=(10, 20, 30)).save(buf, format="JPEG")
+    monkeypatch.setattr(appmod, "HEIC_OK", False)
+    monkeypatch.setattr(appmod, "_heic_to_jpeg_via_imageio", lambda _p: buf.getvalue())
+
+    def no_sips(*_args, **_kwargs):
+        raise AssertionError("sips should not run when ImageIO succeeds")
+
+    monkeypatch.setattr(appmod.subprocess, "run", no_sips)
+
+    out = appmod.image_to_jpeg_bytes(src)
+    assert Image.open(io.BytesIO(out)).size == (1800, 900)
+
+
+def test_small_jpeg_is_passed_through_unchanged(tmp_path: Path):
+    src = tmp_path / "IMG_0002.jpg"
+    Image.new("RGB", (1200, 800), color=(100, 120, 140)).save(src, format="JPEG", quality=90)
+
+    assert appmod.image_to_jpeg_bytes(src) == src.read_bytes()
+
+
+def test_large_jpeg_is_reencoded(tmp_path: Path):
+    src = tmp_path / "IMG_0003.jpg"
+    Image.new("RGB", (2400, 1200), color=(100, 120, 140)).save(src, format="JPEG", quality=90)
+
+    out = appmod.image_to_jpeg_bytes(src)
+    assert out != src.read_bytes()
+    assert Image.open(io.BytesIO(out)).size == (1800, 900)
+
+
+def test_rotated_jpeg_is_not_passed_through(tmp_path: Path):
+    src = tmp_path / "IMG_0004.jpg"
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    Image.new("RGB", (1200, 800), color=(100, 120, 140)).save(src, format="JPEG", exif=exif)
+
+    assert appmod.image_to_jpeg_bytes(src) != src.read_bytes()
+
+
+def test_huge_jpeg_is_draft_decoded_to_exact_max_edge(tmp_path: Path):
+    src = tmp_path / "IMG_0005.jpg"
+    Image.new("RGB", (4000, 3000), color=(100, 120, 140)).save(src, format="JPEG")
+
+    out = appmod.image_to_jpeg_bytes(src)
+    assert Image.open(io.BytesIO(out)).size == (1800, 1350)
+
+
+def test_la_image_is_converted_to_rgb(tmp_path: Path):
+    src = tmp_path / "gray_alpha.png"
+    Image.new("LA", (200, 100), color=(90, 128)).save(src, format="PNG")
+
+    out = appmod.image_to_jpeg_bytes(src)
+    img = Image.open(io.BytesIO(out))
+    assert img.format == "JPEG"
+    assert img.mode == "RGB"
+
+
+def test_preloaded_bytes_are_decoded_without_reading_path(tmp_path: Path):
+    buf = io.BytesIO()
+    Image.new("RGB", (2400, 1200), color=(10, 20, 30)).save(buf, format="PNG")
+
+    out = appmod.image_to_jpeg_bytes(tmp_path / "not_on_disk.png", buf.getvalue())
+    assert Image.open(io.BytesIO(out)).size == (1800, 900)
+
+
+def test_preloaded_heic_bytes_are_decoded(tmp_path: Path):
+    if not appmod.HEIC_OK:
+        pytest.skip("pillow_heif not available")
+    src = tmp_path / "IMG_0007.HEIC"
+    Image.new("RGB", (400, 200), color=(10, 200, 30)).save(src, format="HEIF")
+
+    out = appmod.image_to_jpeg_bytes(tmp_path / "moved.HEIC", src.read_bytes())
+    assert Image.open(io.BytesIO(out)).size == (400, 200)
+
+
+def test_rotated_jpeg_is_transposed_upright(tmp_path: Path):
+    src = tmp_path / "rotated.jpg"
+    exif = Image.Exif()
+    exif[0x0112] = 6  # rotate 90 CW on display
+    Image.new("RGB", (400, 200), color=(50, 60, 70)).save(src, format="JPEG", exif=exif)
+
+    out = appmod.image_to_jpeg_bytes(src)
+    img = Image.open(io.BytesIO(out))
+
+    assert img.size == (200, 400)
+    assert img.getexif().get(0x0112, 1) == 1
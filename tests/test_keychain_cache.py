@@ -0,0 +1,26 @@
+import menubar_notes_to_notion as appmod
+
+
+def test_keychain_get_is_cached_until_set(monkeypatch):
+    store = {"OPENAI_API_KEY": "old"}
+    reads = {"n": 0}
+
+    def fake_get(service, name):
+        reads["n"] += 1
+        return store.get(name)
+
+    def fake_set(service, name, value):
+        store[name] = value
+
+    monkeypatch.setattr(appmod.keyring, "get_password", fake_get)
+    monkeypatch.setattr(appmod.keyring, "set_password", fake_set)
+    appmod._keychain_get_cached.cache_clear()
+
+    assert appmod.keychain_get("OPENAI_API_KEY") == "old"
+    assert appmod.keychain_get("OPENAI_API_KEY") == "old"
+    assert reads["n"] == 1
+
+    appmod.keychain_set("OPENAI_API_KEY", "new")
+    assert appmod.keychain_get("OPENAI_API_KEY") == "new"
+    assert reads["n"] == 2
+    appmod._keychain_get_cached.cache_clear()
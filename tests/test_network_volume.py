@@ -0,0 +1,42 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+import menubar_notes_to_notion as appmod
+
+MACOS_MOUNT = """/dev/disk3s1s1 on / (apfs, sealed, local, read-only, journaled)
+/dev/disk3s5 on /System/Volumes/Data (apfs, local, journaled, nobrowse)
+//me@nas._smb._tcp.local/Scans on /Volumes/Scans (smbfs, nodev, nosuid, mounted by me)
+"""
+
+LINUX_MOUNT = """/dev/sda1 on / type ext4 (rw,relatime)
+nas:/export/scans on /mnt/scans type nfs4 (rw,relatime)
+"""
+
+
+def _fake_mount(monkeypatch, output):
+    monkeypatch.setattr(appmod.subprocess, "run", lambda *_a, **_k: SimpleNamespace(stdout=output))
+
+
+def test_smb_share_on_macos_is_network(monkeypatch):
+    _fake_mount(monkeypatch, MACOS_MOUNT)
+    assert appmod.is_network_volume(Path("/Volumes/Scans/inbox")) is True
+
+
+def test_local_apfs_folder_is_not_network(monkeypatch):
+    _fake_mount(monkeypatch, MACOS_MOUNT)
+    assert appmod.is_network_volume(Path("/Volumes/ScansLocal")) is False
+    assert appmod.is_network_volume(Path("/System/Volumes/Data/Users/me/Notes")) is False
+
+
+def test_nfs_mount_on_linux_is_network(monkeypatch):
+    _fake_mount(monkeypatch, LINUX_MOUNT)
+    assert appmod.is_network_volume(Path("/mnt/scans")) is True
+    assert appmod.is_network_volume(Path("/home/me")) is False
+
+
+def test_mount_failure_means_local(monkeypatch):
+    def boom(*_a, **_k):
+        raise OSError("no mount binary")
+
+    monkeypatch.setattr(appmod.subprocess, "run", boom)
+    assert appmod.is_network_volume(Path("/Volumes/Scans")) is False
@@ -234,6 +234,8 @@ def test_failure_notification_sent_once_on_folder_exception(monkeypatch, tmp_pat
 
     handler.on_created(Event())
 
+    handler.wait_idle()
+
     assert called["n"] == 1
     assert called["path"] == img
     assert "Feilet her" in str(called["exc"])
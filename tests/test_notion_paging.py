@@ -1,3 +1,5 @@
+import pytest
+
 import menubar_notes_to_notion as appmod
 
 
@@ -16,7 +18,7 @@ def test_find_first_h1_id_paginates(monkeypatch):
 
     calls = {"n": 0}
 
-    def fake_get(url, headers):
+    def fake_get(url, **kwargs):
         calls["n"] += 1
         if calls["n"] == 1:
             return DummyResp(200, {
@@ -30,7 +32,7 @@ def test_find_first_h1_id_paginates(monkeypatch):
             "next_cursor": None
         })
 
-    monkeypatch.setattr(appmod.requests, "get", fake_get)
+    monkeypatch.setattr(notion.session, "get", fake_get)
 
     assert notion.find_first_h1_id("PAGE", page_size=1) == "H1ID"
     assert calls["n"] == 2
@@ -41,7 +43,7 @@ def test_list_children_ids_paginates(monkeypatch):
 
     calls = {"n": 0}
 
-    def fake_get(url, headers):
+    def fake_get(url, **kwargs):
         calls["n"] += 1
         if calls["n"] == 1:
             return DummyResp(200, {
@@ -55,7 +57,7 @@ def test_list_children_ids_paginates(monkeypatch):
             "next_cursor": None
         })
 
-    monkeypatch.setattr(appmod.requests, "get", fake_get)
+    monkeypatch.setattr(notion.session, "get", fake_get)
 
     assert notion.list_children_ids("PAGE", page_size=2) == ["a", "b", "c"]
     assert calls["n"] == 2
@@ -66,10 +68,10 @@ def test_append_children_returns_json(monkeypatch):
 
     payload = {"results": [{"id": "abc", "type": "heading_2"}]}
 
-    def fake_patch(url, headers, data):
+    def fake_patch(url, **kwargs):
         return DummyResp(200, payload)
 
-    monkeypatch.setattr(appmod.requests, "patch", fake_patch)
+    monkeypatch.setattr(notion.session, "patch", fake_patch)
 
     out = notion.append_children("PAGE", [{"object": "block"}], after_block_id=None)
     assert out == payload
@@ -78,13 +80,96 @@ def test_append_children_returns_json(monkeypatch):
 def test_resolve_parent_page_id_walks_block_chain(monkeypatch):
     notion = appmod.NotionClient(token="x")
 
-    def fake_get(url, headers):
+    def fake_get(url, **kwargs):
         if url.endswith("/blocks/child-block"):
             return DummyResp(200, {"parent": {"type": "block_id", "block_id": "parent-block"}})
         if url.endswith("/blocks/parent-block"):
             return DummyResp(200, {"parent": {"type": "page_id", "page_id": "page-1234"}})
         return DummyResp(404, {"error": "not found"})
 
-    monkeypatch.setattr(appmod.requests, "get", fake_get)
+    monkeypatch.setattr(notion.session, "get", fake_get)
 
     assert notion.resolve_parent_page_id("child-block") == "page-1234"
+
+
+def test_notion_retry_only_retries_429_for_non_idempotent_methods():
+    adapter = appmod.NotionClient(token="x").session.get_adapter("https://api.notion.com/v1")
+    retry = adapter.max_retries
+
+    assert retry.is_retry("GET", 503) is True
+    assert retry.is_retry("PATCH", 429) is True
+    assert retry.is_retry("PATCH", 503) is False
+    assert retry.is_retry("POST", 502) is False
+
+
+def test_notion_retry_does_not_replay_append_after_read_error():
+    from urllib3.exceptions import ReadTimeoutError
+
+    adapter = appmod.NotionClient(token="x").session.get_adapter("https://api.notion.com/v1")
+    retry = adapter.max_retries
+    error = ReadTimeoutError(None, "/v1/blocks/b/children", "read timed out")
+
+    assert retry.increment(method="GET", url="/v1/blocks/b/children", error=error).total == retry.total - 1
+    with pytest.raises(ReadTimeoutError):
+        retry.increment(method="PATCH", url="/v1/blocks/b/children", error=error)
+    with pytest.raises(ReadTimeoutError):
+        retry.increment(method="POST", url="/v1/file_uploads", error=error)
+
+
+def test_auth_headers_are_set_once_on_session(monkeypatch):
+    notion = appmod.NotionClient(token="secret")
+    seen = {}
+
+    def fake_patch(url, **kwargs):
+        seen.update(kwargs)
+        return DummyResp(200, {"results": []})
+
+    monkeypatch.setattr(notion.session, "patch", fake_patch)
+    notion.append_children("PAGE", [{"object": "block"}])
+
+    assert notion.session.headers["Authorization"] == "Bearer secret"
+    assert notion.session.headers["Notion-Version"] == appmod.NOTION_VERSION
+    assert seen["headers"] == {"Content-Type": "application/json"}
+
+
+def test_find_first_h1_id_is_cached_until_append_after_it_fails(monkeypatch):
+    notion = appmod.NotionClient(token="x")
+    calls = {"get": 0}
+
+    def fake_get(url, **kwargs):
+        calls["get"] += 1
+        return DummyResp(200, {
+            "results": [{"id": "H1ID", "type": "heading_1"}],
+            "has_more": False,
+            "next_cursor": None
+        })
+
+    monkeypatch.setattr(notion.session, "get", fake_get)
+    monkeypatch.setattr(notion.session, "patch", lambda url, **kwargs: DummyResp(400, {"code": "validation_error"}))
+
+    assert notion.find_first_h1_id("PAGE") == "H1ID"
+    assert notion.find_first_h1_id("PAGE") == "H1ID"
+    assert calls["get"] == 1
+
+    with pytest.raises(RuntimeError):
+        notion.append_children("PAGE", [], after_block_id="H1ID")
+    assert notion.find_first_h1_id("PAGE") == "H1ID"
+    assert calls["get"] == 2
+
+
+def test_find_first_h1_id_cache_expires(monkeypatch):
+    notion = appmod.NotionClient(token="x")
+    calls = {"get": 0}
+    now = {"t": 1000.0}
+
+    def fake_get(url, **kwargs):
+        calls["get"] += 1
+        return DummyResp(200, {"results": [{"id": "H1ID", "type": "heading_1"}], "has_more": False})
+
+    monkeypatch.setattr(notion.session, "get", fake_get)
+    monkeypatch.setattr(appmod.time, "monotonic", lambda: now["t"])
+
+    notion.find_first_h1_id("PAGE")
+    now["t"] += appmod.H1_CACHE_TTL_SECS + 1
+    notion.find_first_h1_id("PAGE")
+    assert calls["get"] == 2
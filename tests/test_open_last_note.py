@@ -10,8 +10,8 @@ def test_pipeline_process_persists_last_note_url(monkeypatch, tmp_path: Path):
 
     monkeypatch.setattr(appmod, "state_load", lambda: {"processed": {}})
     saved_states = []
-    monkeypatch.setattr(appmod, "state_save", lambda state: saved_states.append(copy.deepcopy(state)))
-    monkeypatch.setattr(appmod, "image_to_jpeg_bytes", lambda p: b"jpegbytes")
+    monkeypatch.setattr(appmod, "state_append", lambda record: saved_states.append(copy.deepcopy(record)))
+    monkeypatch.setattr(appmod, "image_to_jpeg_bytes", lambda p, _data=None: b"jpegbytes")
     monkeypatch.setattr(
         appmod.Pipeline,
         "transcribe_from_jpeg",
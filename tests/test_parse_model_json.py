@@ -0,0 +1,39 @@
+import pytest
+
+import menubar_notes_to_notion as appmod
+
+
+def test_parses_bare_object():
+    assert appmod.parse_model_json('{"topics": []}') == {"topics": []}
+
+
+def test_extracts_object_from_code_fence_and_trailing_text():
+    out = 'Here you go:\n```json\n{"topics": [{"title": "A {b}"}]}\n```\nNote: {not json}'
+    assert appmod.parse_model_json(out) == {"topics": [{"title": "A {b}"}]}
+
+
+def test_braces_and_escaped_quotes_inside_strings_are_ignored():
+    out = 'x {"topics": ["say \\"}\\" twice", "{"]} y'
+    assert appmod.parse_model_json(out) == {"topics": ['say "}" twice', "{"]}
+
+
+def test_unbalanced_output_raises():
+    with pytest.raises(RuntimeError):
+        appmod.parse_model_json('{"topics": [')
+
+
+def test_skips_non_json_braces_in_leading_prose():
+    out = 'Parsed {the page} below:\n{"topics": [{"title": "A"}]}'
+    assert appmod.parse_model_json(out) == {"topics": [{"title": "A"}]}
+
+
+def test_truncated_reply_raises_instead_of_returning_inner_fragment():
+    out = '{"topics": [{"title": "Standup", "tasks": [{"text": "ship it", "done": false}], "notes": ["a'
+    with pytest.raises(RuntimeError):
+        appmod.parse_model_json(out)
+
+
+def test_batch_reply_requires_results_key():
+    assert appmod.parse_model_json('{"results": []}', key="results") == {"results": []}
+    with pytest.raises(RuntimeError):
+        appmod.parse_model_json('{"topics": []}', key="results")
@@ -1,4 +1,4 @@
-from prompt_contract import PROMPT
+from prompt_contract import PROMPT, batch_prompt
 
 
 def test_prompt_uses_dot_space_not_plain_dot():
@@ -12,4 +12,10 @@ def test_prompt_defines_numbered_rule():
 
 
 def test_prompt_requires_prefix_space():
-    assert 'must be first character' in PROMPT
\ No newline at end of file
+    assert 'must be first character' in PROMPT
+
+def test_batch_prompt_extends_single_prompt_with_result_count():
+    text = batch_prompt(3)
+    assert text.startswith(PROMPT)
+    assert '"results"' in text
+    assert "exactly 3 items" in text
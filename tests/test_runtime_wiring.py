@@ -1,3 +1,4 @@
+from concurrent.futures import wait
 from pathlib import Path
 from datetime import datetime
 
@@ -15,7 +16,7 @@ def test_pipeline_process_uses_build_notion_blocks(monkeypatch, tmp_path: Path):
     monkeypatch.setattr(appmod.Pipeline, "mark", lambda self, fp, name: None)
 
     # Monkeypatch image conversion
-    monkeypatch.setattr(appmod, "image_to_jpeg_bytes", lambda p: b"jpegbytes")
+    monkeypatch.setattr(appmod, "image_to_jpeg_bytes", lambda p, _data=None: b"jpegbytes")
 
     # Monkeypatch transcription (no OpenAI call)
     monkeypatch.setattr(appmod.Pipeline, "transcribe_from_jpeg", lambda self, jpeg, fname: {
@@ -109,7 +110,7 @@ def test_folder_on_created_triggers_notify_on_success(monkeypatch, tmp_path: Pat
 
     monkeypatch.setattr(appmod.Pipeline, "seen", lambda self, fp: False)
     monkeypatch.setattr(appmod.Pipeline, "mark", lambda self, fp, name: None)
-    monkeypatch.setattr(appmod, "image_to_jpeg_bytes", lambda p: b"jpegbytes")
+    monkeypatch.setattr(appmod, "image_to_jpeg_bytes", lambda p, _data=None: b"jpegbytes")
     monkeypatch.setattr(
         appmod.Pipeline,
         "transcribe_from_jpeg",
@@ -169,6 +170,8 @@ def test_folder_on_created_triggers_notify_on_success(monkeypatch, tmp_path: Pat
 
     handler.on_created(Event())
 
+    handler.wait_idle()
+
     assert notified["n"] == 1
     assert notified["title"] != ""
     assert notified["body"] != ""
@@ -197,6 +200,8 @@ def test_folder_on_created_calls_refresh_menu_cb(monkeypatch, tmp_path: Path):
         src_path = str(img)
 
     handler.on_created(Event())
+
+    handler.wait_idle()
     assert refreshed["n"] == 1
 
 
@@ -207,7 +212,7 @@ def test_pipeline_process_records_usage_event(monkeypatch, tmp_path: Path):
     monkeypatch.setattr(appmod, "USAGE_PATH", usage_path)
     monkeypatch.setattr(appmod.Pipeline, "seen", lambda self, fp: False)
     monkeypatch.setattr(appmod.Pipeline, "mark", lambda self, fp, name: None)
-    monkeypatch.setattr(appmod, "image_to_jpeg_bytes", lambda p: b"jpegbytes")
+    monkeypatch.setattr(appmod, "image_to_jpeg_bytes", lambda p, _data=None: b"jpegbytes")
     monkeypatch.setattr(appmod.time, "sleep", lambda _n: None)
     monkeypatch.setattr(
         appmod,
@@ -299,3 +304,456 @@ def test_transcribe_extracts_usage_tokens_from_response():
     assert parsed == {"topics": []}
     assert p._last_usage["input_tokens"] == 321
     assert p._last_usage["output_tokens"] == 123
+
+
+def test_transcribe_sends_configured_image_detail():
+    captured = {}
+
+    class FakeResp:
+        model = "gpt-5-mini"
+        usage = None
+        output_text = '{"topics": []}'
+
+    class FakeResponses:
+        def create(self, **kwargs):
+            captured.update(kwargs)
+            return FakeResp()
+
+    class FakeClient:
+        responses = FakeResponses()
+
+    p = appmod.Pipeline(
+        openai_key="x",
+        model="gpt-5-mini",
+        notion_token="y",
+        page_id="PAGEID",
+        status_cb=lambda msg: None,
+        image_detail="high",
+    )
+    p.client = FakeClient()
+
+    p.transcribe_from_jpeg(b"jpeg", "IMG_1234.HEIC")
+    image_part = captured["input"][0]["content"][1]
+    assert image_part["type"] == "input_image"
+    assert image_part["detail"] == "high"
+
+
+def test_prefetch_transcribes_on_pool_and_appends_in_caller_order(monkeypatch, tmp_path: Path):
+    a = tmp_path / "IMG_1.HEIC"
+    b = tmp_path / "IMG_2.HEIC"
+    a.write_bytes(b"a")
+    b.write_bytes(b"b")
+    monkeypatch.setattr(appmod, "USAGE_PATH", tmp_path / "usage.json")
+    monkeypatch.setattr(appmod.Pipeline, "mark", lambda self, fp, name: None)
+    monkeypatch.setattr(appmod.Pipeline, "record_usage", lambda self, filename: None)
+    monkeypatch.setattr(appmod, "image_to_jpeg_bytes", lambda p, _data=None: b"jpegbytes")
+    monkeypatch.setattr(appmod, "notify", lambda *args, **kwargs: None)
+
+    threads = []
+
+    def fake_transcribe(self, jpeg, fname):
+        threads.append(appmod.threading.current_thread().name)
+        return {"topics": [{"title": "General", "tasks": [], "notes": [f"# {fname}"], "questions": []}]}
+
+    monkeypatch.setattr(appmod.Pipeline, "transcribe_from_jpeg", fake_transcribe)
+
+    class FakeNotion:
+        appended = []
+
+        def upload_image_bytes(self, filename, data, content_type="image/jpeg"):
+            return None
+
+        def find_first_h1_id(self, page_id, page_size=50):
+            return None
+
+        def list_children_ids(self, block_id, page_size=50):
+            return []
+
+        def append_children(self, block_id, children, after_block_id=None):
+            self.appended.append(children)
+            return {"results": [{"id": f"id-{len(self.appended)}", "type": children[0].get("type")}]}
+
+        def resolve_parent_page_id(self, block_id):
+            return None
+
+    p = appmod.Pipeline(
+        openai_key="x",
+        model="gpt-5-mini",
+        notion_token="y",
+        page_id="PAGEID",
+        status_cb=lambda msg: None,
+        max_workers=2,
+        transcribe_batch_size=1,
+    )
+    p.notion = FakeNotion()
+    p.state = {"processed": {}}
+
+    p.prefetch([a, b])
+    p.process(a)
+    p.process(b)
+    p.close()
+
+    assert len(threads) == 2
+    assert all(name.startswith("pipeline") for name in threads)
+    headings = [c[0] for c in p.notion.appended if c and c[0].get("type") == "heading_2"]
+    titles = ["".join(rt["text"]["content"] for rt in h["heading_2"]["rich_text"] if rt["type"] == "text") for h in headings]
+    assert titles == [" — IMG_1.HEIC", " — IMG_2.HEIC"]
+
+
+def test_prefetch_batches_images_into_one_transcription_call(monkeypatch, tmp_path: Path):
+    paths = [tmp_path / f"IMG_{i}.HEIC" for i in range(3)]
+    for path in paths:
+        path.write_bytes(path.name.encode())
+    monkeypatch.setattr(appmod, "image_to_jpeg_bytes", lambda p, _data=None: b"jpegbytes")
+
+    calls = []
+
+    class FakeResp:
+        model = "gpt-5-mini"
+        usage = {"input_tokens": 100, "output_tokens": 31}
+        output_text = (
+            '{"results": ['
+            '{"topics": [{"title": "A", "tasks": [], "notes": [], "questions": []}]},'
+            '{"topics": [{"title": "B", "tasks": [], "notes": [], "questions": []}]},'
+            '{"topics": [{"title": "C", "tasks": [], "notes": [], "questions": []}]}'
+            ']}'
+        )
+
+    class FakeResponses:
+        def create(self, **kwargs):
+            calls.append(kwargs)
+            return FakeResp()
+
+    class FakeClient:
+        responses = FakeResponses()
+
+    class FakeNotion:
+        def upload_image_bytes(self, filename, data, content_type="image/jpeg"):
+            return f"UP-{filename}"
+
+    p = appmod.Pipeline(
+        openai_key="x",
+        model="gpt-5-mini",
+        notion_token="y",
+        page_id="PAGEID",
+        status_cb=lambda msg: None,
+        transcribe_batch_size=4,
+    )
+    p.client = FakeClient()
+    p.notion = FakeNotion()
+    p.state = {"processed": {}}
+
+    p.prefetch(paths)
+    prepared = [p._take_prepared(path) for path in paths]
+    p.close()
+
+    assert len(calls) == 1
+    content = calls[0]["input"][0]["content"]
+    assert [c["type"] for c in content] == ["input_text"] + ["input_image"] * 3
+    assert [pi.parsed["topics"][0]["title"] for pi in prepared] == ["A", "B", "C"]
+    assert [pi.image_file_upload_id for pi in prepared] == ["UP-IMG_0.jpg", "UP-IMG_1.jpg", "UP-IMG_2.jpg"]
+    assert sum(pi.usage["input_tokens"] for pi in prepared) == 100
+    assert sum(pi.usage["output_tokens"] for pi in prepared) == 31
+
+
+def test_close_during_running_group_makes_no_further_transcription_calls(monkeypatch, tmp_path: Path):
+    paths = [tmp_path / f"IMG_{i}.HEIC" for i in range(3)]
+    for path in paths:
+        path.write_bytes(path.name.encode())
+    monkeypatch.setattr(appmod, "image_to_jpeg_bytes", lambda p, _data=None: b"jpegbytes")
+    monkeypatch.setattr(appmod, "log", lambda msg: None)
+
+    calls = []
+
+    class FakeResponses:
+        def create(self, **kwargs):
+            calls.append(kwargs)
+            # Stop arrives while the batch call is in flight; the batch then fails,
+            # which would normally fall back to one call per image.
+            p.close()
+            raise RuntimeError("connection reset")
+
+    class FakeClient:
+        responses = FakeResponses()
+
+        def close(self):
+            pass
+
+    class FakeNotion:
+        def upload_image_bytes(self, filename, data, content_type="image/jpeg"):
+            return None
+
+    p = appmod.Pipeline(
+        openai_key="x",
+        model="gpt-5-mini",
+        notion_token="y",
+        page_id="PAGEID",
+        status_cb=lambda msg: None,
+        transcribe_batch_size=4,
+    )
+    p.client = FakeClient()
+    p.notion = FakeNotion()
+    p.state = {"processed": {}}
+    monkeypatch.setattr(p, "flush_state", lambda: None)
+
+    p.prefetch(paths)
+    futures = list(p._prefetched.values())
+    wait(futures, timeout=5)
+
+    assert len(calls) == 1
+    assert all(f.cancelled() for f in futures)
+
+
+def test_batch_with_wrong_result_count_falls_back_to_single_calls(monkeypatch, tmp_path: Path):
+    paths = [tmp_path / f"IMG_{i}.HEIC" for i in range(2)]
+    for path in paths:
+        path.write_bytes(path.name.encode())
+    monkeypatch.setattr(appmod, "image_to_jpeg_bytes", lambda p, _data=None: b"jpegbytes")
+    monkeypatch.setattr(
+        appmod.Pipeline,
+        "transcribe_batch_from_jpegs",
+        lambda self, jpegs, names: (_ for _ in ()).throw(RuntimeError("Model did not return one result per image.")),
+    )
+    monkeypatch.setattr(
+        appmod.Pipeline,
+        "transcribe_from_jpeg",
+        lambda self, jpeg, fname: {"topics": [{"title": fname, "tasks": [], "notes": [], "questions": []}]},
+    )
+
+    class FakeNotion:
+        def upload_image_bytes(self, filename, data, content_type="image/jpeg"):
+            return None
+
+    p = appmod.Pipeline(
+        openai_key="x",
+        model="gpt-5-mini",
+        notion_token="y",
+        page_id="PAGEID",
+        status_cb=lambda msg: None,
+    )
+    p.notion = FakeNotion()
+    p.state = {"processed": {}}
+
+    p.prefetch(paths)
+    titles = [p._take_prepared(path).parsed["topics"][0]["title"] for path in paths]
+    p.close()
+
+    assert titles == ["IMG_0.HEIC", "IMG_1.HEIC"]
+
+
+def test_wait_until_stable_polls_at_short_interval(monkeypatch, tmp_path: Path):
+    img = tmp_path / "IMG_STABLE.HEIC"
+    img.write_bytes(b"done")
+    sleeps = []
+    monkeypatch.setattr(appmod.time, "sleep", lambda n: sleeps.append(n))
+
+    class DummyPipeline:
+        def process(self, path):
+            return None
+
+    handler = appmod.FolderHandler(DummyPipeline(), tmp_path, lambda msg: None)
+
+    assert handler._wait_until_stable_all([img]) == [img]
+    assert sleeps == [appmod.STABLE_POLL_SECS] * 3
+
+
+def test_wait_until_stable_all_settles_burst_in_one_window(monkeypatch, tmp_path: Path):
+    imgs = [tmp_path / f"IMG_{i}.HEIC" for i in range(5)]
+    for img in imgs:
+        img.write_bytes(b"done")
+    gone = tmp_path / "IMG_GONE.HEIC"
+    sleeps = []
+    monkeypatch.setattr(appmod.time, "sleep", lambda n: sleeps.append(n))
+
+    class DummyPipeline:
+        def process(self, path):
+            return None
+
+    handler = appmod.FolderHandler(DummyPipeline(), tmp_path, lambda msg: None)
+
+    assert handler._wait_until_stable_all(imgs + [gone]) == imgs
+    assert sleeps == [appmod.STABLE_POLL_SECS] * 3
+
+
+def test_wait_until_stable_all_requires_quiet_window_after_pause(monkeypatch, tmp_path: Path):
+    img = tmp_path / "IMG_SLOW.HEIC"
+    img.write_bytes(b"part")
+    sleeps = []
+
+    def fake_sleep(n):
+        sleeps.append(n)
+        if len(sleeps) == 2:
+            # The writer resumes after a pause longer than one poll tick.
+            img.write_bytes(b"part + rest")
+
+    monkeypatch.setattr(appmod.time, "sleep", fake_sleep)
+
+    class DummyPipeline:
+        def process(self, path):
+            return None
+
+    handler = appmod.FolderHandler(DummyPipeline(), tmp_path, lambda msg: None)
+
+    assert handler._wait_until_stable_all([img]) == [img]
+    # Ready only after three unchanged polls following the second write.
+    assert len(sleeps) == 5
+
+
+def test_folder_on_closed_processes_like_on_created(monkeypatch, tmp_path: Path):
+    img = tmp_path / "IMG_CLOSED.HEIC"
+    img.write_bytes(b"fake")
+    monkeypatch.setattr(appmod.time, "sleep", lambda _n: None)
+    processed = []
+
+    class DummyPipeline:
+        def process(self, path):
+            processed.append(path.name)
+
+    handler = appmod.FolderHandler(DummyPipeline(), tmp_path, lambda msg: None)
+
+    class Event:
+        is_directory = False
+        src_path = str(img)
+
+    handler.on_closed(Event())
+
+    handler.wait_idle()
+    assert processed == ["IMG_CLOSED.HEIC"]
+
+
+def test_prepare_overlaps_upload_with_transcription(monkeypatch, tmp_path: Path):
+    img = tmp_path / "IMG_OVERLAP.HEIC"
+    img.write_bytes(b"fake")
+    monkeypatch.setattr(appmod, "image_to_jpeg_bytes", lambda p, _data=None: b"jpegbytes")
+
+    both_running = appmod.threading.Barrier(2, timeout=5)
+
+    def fake_transcribe(self, jpeg, fname):
+        both_running.wait()
+        return {"topics": []}
+
+    monkeypatch.setattr(appmod.Pipeline, "transcribe_from_jpeg", fake_transcribe)
+
+    class FakeNotion:
+        def upload_image_bytes(self, filename, data, content_type="image/jpeg"):
+            both_running.wait()
+            return "UPLOAD123"
+
+    p = appmod.Pipeline(
+        openai_key="x",
+        model="gpt-5-mini",
+        notion_token="y",
+        page_id="PAGEID",
+        status_cb=lambda msg: None,
+    )
+    p.notion = FakeNotion()
+    p.state = {"processed": {}}
+
+    prepared = p.prepare(img)
+    p.close()
+
+    assert prepared.parsed == {"topics": []}
+    assert prepared.image_file_upload_id == "UPLOAD123"
+
+
+def test_folder_on_created_returns_immediately_and_coalesces_burst(monkeypatch, tmp_path: Path):
+    imgs = [tmp_path / f"IMG_{i}.HEIC" for i in range(3)]
+    for img in imgs:
+        img.write_bytes(b"fake")
+    monkeypatch.setattr(appmod.time, "sleep", lambda _n: None)
+    release = appmod.threading.Event()
+    batches = []
+    processed = []
+
+    class DummyPipeline:
+        def start_batch(self, ignore_window=False):
+            batches.append(1)
+            release.wait(timeout=5)
+
+        def process(self, path):
+            processed.append(path.name)
+
+    handler = appmod.FolderHandler(DummyPipeline(), tmp_path, lambda msg: None)
+
+    for img in imgs:
+        class Event:
+            is_directory = False
+            src_path = str(img)
+
+        handler.on_created(Event())
+    assert processed == []
+
+    release.set()
+    handler.wait_idle()
+    handler.stop(timeout=5)
+
+    assert sorted(processed) == [img.name for img in imgs]
+    assert len(batches) == 1
+
+
+def test_folder_stop_mid_batch_leaves_unprocessed_files_in_watch_folder(monkeypatch, tmp_path: Path):
+    imgs = [tmp_path / f"IMG_{i}.HEIC" for i in range(4)]
+    for img in imgs:
+        img.write_bytes(b"fake")
+    monkeypatch.setattr(appmod.time, "sleep", lambda _n: None)
+    monkeypatch.setattr(appmod, "notify_failed_image", lambda *a, **k: None)
+    monkeypatch.setattr(appmod, "log", lambda msg: None)
+    started = appmod.threading.Event()
+    release = appmod.threading.Event()
+    processed = []
+
+    class DummyPipeline:
+        def process(self, path):
+            started.set()
+            release.wait(timeout=5)
+            processed.append(path.name)
+
+    handler = appmod.FolderHandler(DummyPipeline(), tmp_path, lambda msg: None)
+    handler.process_backlog()
+    assert started.wait(timeout=5)
+
+    assert handler.stop(timeout=0) is False
+    release.set()
+    assert handler.join(timeout=5) is True
+
+    assert processed == ["IMG_0.HEIC"]
+    assert (tmp_path / "_processed" / "IMG_0.HEIC").exists()
+    assert sorted(p.name for p in appmod.list_pending_images(tmp_path)) == [img.name for img in imgs[1:]]
+    assert list((tmp_path / "_failed").iterdir()) == []
+
+
+def test_openai_http_client_keeps_connections_warm_per_worker(monkeypatch):
+    captured = {}
+
+    class FakeHttpx:
+        @staticmethod
+        def Limits(**kwargs):
+            return kwargs
+
+    monkeypatch.setattr(appmod, "httpx", FakeHttpx)
+    monkeypatch.setattr(appmod, "DefaultHttpxClient", lambda **kwargs: captured.update(kwargs) or "client")
+
+    assert appmod._openai_http_client(3) == "client"
+    assert captured["http2"] is appmod.HTTP2_OK
+    assert captured["limits"]["max_keepalive_connections"] == 3
+    assert captured["limits"]["keepalive_expiry"] == appmod.OPENAI_KEEPALIVE_SECS
+
+
+def test_pipeline_openai_client_retries_transient_errors(monkeypatch):
+    captured = {}
+
+    class FakeOpenAI:
+        def __init__(self, **kwargs):
+            captured.update(kwargs)
+
+    monkeypatch.setattr(appmod, "OpenAI", FakeOpenAI)
+    p = appmod.Pipeline(
+        openai_key="x",
+        model="gpt-5.2",
+        notion_token="y",
+        page_id="PAGEID",
+        status_cb=lambda msg: None,
+    )
+    p.close()
+
+    assert captured["max_retries"] == appmod.OPENAI_MAX_RETRIES
@@ -0,0 +1,88 @@
+from pathlib import Path
+
+import pytest
+
+import menubar_notes_to_notion as appmod
+
+
+def _pipeline():
+    return appmod.Pipeline(
+        openai_key="x",
+        model="gpt-5-mini",
+        notion_token="y",
+        page_id="PAGEID",
+        status_cb=lambda _msg: None,
+    )
+
+
+def test_mark_appends_log_and_state_load_replays_it(monkeypatch, tmp_path: Path):
+    state_path = tmp_path / "processed.json"
+    monkeypatch.setattr(appmod, "STATE_PATH", state_path)
+
+    p = _pipeline()
+    p.state["last_note_url"] = "https://www.notion.so/abc"
+    p.mark("fp1", "a.png")
+    p.mark("fp2", "b.png")
+
+    assert not state_path.exists()
+    assert len(appmod.state_log_path().read_text("utf-8").splitlines()) == 2
+
+    state = appmod.state_load()
+    assert set(state["processed"]) == {"fp1", "fp2"}
+    assert state["processed"]["fp2"]["name"] == "b.png"
+    assert state["last_note_url"] == "https://www.notion.so/abc"
+
+
+def test_state_load_skips_torn_log_line(monkeypatch, tmp_path: Path):
+    monkeypatch.setattr(appmod, "STATE_PATH", tmp_path / "processed.json")
+    appmod.state_append({"fp": "fp1", "name": "a.png", "ts": 1.0})
+    with open(appmod.state_log_path(), "a", encoding="utf-8") as f:
+        f.write('{"fp": "fp2", "na')
+
+    state = appmod.state_load()
+    assert list(state["processed"]) == ["fp1"]
+
+
+def test_compaction_writes_snapshot_and_drops_log(monkeypatch, tmp_path: Path):
+    state_path = tmp_path / "processed.json"
+    monkeypatch.setattr(appmod, "STATE_PATH", state_path)
+    monkeypatch.setattr(appmod, "STATE_COMPACT_EVERY", 2)
+
+    p = _pipeline()
+    p.mark("fp1", "a.png")
+    p.mark("fp2", "b.png")
+    assert state_path.exists()
+    assert not appmod.state_log_path().exists()
+
+    p.mark("fp3", "c.png")
+    p.close()
+    assert not appmod.state_log_path().exists()
+    assert set(appmod.state_load()["processed"]) == {"fp1", "fp2", "fp3"}
+
+
+def test_state_and_config_roundtrip_without_orjson(monkeypatch, tmp_path: Path):
+    monkeypatch.setattr(appmod, "orjson", None)
+    monkeypatch.setattr(appmod, "STATE_PATH", tmp_path / "processed.json")
+    monkeypatch.setattr(appmod, "CONFIG_PATH", tmp_path / "config.json")
+
+    appmod.save_config({"WATCH_FOLDER": "/tmp/møter"})
+    appmod.state_save({"processed": {"fp1": {"name": "a.png", "ts": 1.0}}})
+    appmod.state_append({"fp": "fp2", "name": "b.png", "ts": 2.0})
+
+    assert appmod.load_config() == {"WATCH_FOLDER": "/tmp/møter"}
+    assert set(appmod.state_load()["processed"]) == {"fp1", "fp2"}
+
+
+def test_state_save_failure_keeps_previous_snapshot(monkeypatch, tmp_path: Path):
+    state_path = tmp_path / "processed.json"
+    monkeypatch.setattr(appmod, "STATE_PATH", state_path)
+    appmod.state_save({"processed": {"fp1": {"name": "a.png", "ts": 1.0}}})
+
+    def boom(*_args, **_kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(appmod.os, "replace", boom)
+    with pytest.raises(OSError):
+        appmod.state_save({"processed": {}})
+
+    assert list(appmod.state_load()["processed"]) == ["fp1"]